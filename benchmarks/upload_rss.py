@@ -0,0 +1,116 @@
+"""Peak memory of streaming a large file upload.
+
+Creates a file (300MB by default), starts a local stand-in for Slack's
+upload URL that discards what it receives, and POSTs the file with
+slackasme.utils.upload.post_file. Each run happens in a fresh subprocess
+so its peak RSS is measured in isolation; a "read-all" run (the whole file
+read into memory first, as files_upload_v2 does) is included for contrast.
+
+Usage (from the repo root, with slackasme installed: make dev):
+    python benchmarks/upload_rss.py
+    python benchmarks/upload_rss.py --size-mb 50
+"""
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+from urllib.request import Request, urlopen
+
+from slackasme.utils.upload import post_file
+
+
+class DiscardHandler(BaseHTTPRequestHandler):
+    """Reads the request body in small pieces and throws it away."""
+
+    def do_POST(self):
+        remaining = int(self.headers["Content-Length"])
+        while remaining:
+            remaining -= len(self.rfile.read(min(remaining, 64 * 1024)))
+        self.send_response(200)
+        self.send_header("Content-Length", "2")
+        self.end_headers()
+        self.wfile.write(b"OK")
+
+    def log_message(self, format, *args):
+        pass
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process (ru_maxrss is KB on Linux, bytes on macOS)."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def run(mode: str, path: str) -> dict:
+    """Upload `path` once in this process and report timing and peak RSS."""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), DiscardHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_port}/upload"
+    baseline = peak_rss_mb()
+
+    started = time.monotonic()
+    if mode == "stream":
+        post_file(SimpleNamespace(timeout=60, ssl=None), url, path)
+    else:
+        with open(path, "rb") as f:
+            data = f.read()
+        with urlopen(Request(url, data=data, method="POST"), timeout=60) as response:
+            response.read()
+    seconds = time.monotonic() - started
+
+    server.shutdown()
+    size = os.path.getsize(path)
+    return {
+        "mode": mode,
+        "size_mb": size / 1024 / 1024,
+        "seconds": seconds,
+        "mb_per_second": size / 1024 / 1024 / seconds,
+        "baseline_rss_mb": baseline,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=int, default=300, help="Size of the test file")
+    parser.add_argument("--run", choices=["stream", "read-all"], help=argparse.SUPPRESS)
+    parser.add_argument("--path", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        print(json.dumps(run(args.run, args.path)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "upload.bin")
+        with open(path, "wb") as f:
+            chunk = os.urandom(1024 * 1024)
+            for _ in range(args.size_mb):
+                f.write(chunk)
+
+        print(f"{'mode':<10} {'size':>8} {'time':>8} {'MB/s':>8} {'base RSS':>10} {'peak RSS':>10}")
+        for mode in ("stream", "read-all"):
+            output = subprocess.run(
+                [sys.executable, __file__, "--run", mode, "--path", path],
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            r = json.loads(output)
+            print(
+                f"{r['mode']:<10} {r['size_mb']:>6.0f}MB {r['seconds']:>7.2f}s"
+                f" {r['mb_per_second']:>8.1f} {r['baseline_rss_mb']:>8.1f}MB"
+                f" {r['peak_rss_mb']:>8.1f}MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -4,7 +4,7 @@
 import click
 
 from slackasme import __version__
-from slackasme.commands import auth, channel, dm, file, message, reaction, search, user
+from slackasme.commands import auth, channel, dm, file, message, reaction, search, sync, user
 from slackasme.logging import setup_logging
 
 
@@ -29,6 +29,7 @@ cli.add_command(dm.dm)
 cli.add_command(reaction.reaction)
 cli.add_command(file.file)
 cli.add_command(search.search)
+cli.add_command(sync.sync)
 cli.add_command(auth.auth)
 
 
@@ -14,8 +14,9 @@ _client = None
 
 
 def mask_token(text: str) -> str:
-    """Mask any xoxp-/xoxb- tokens in text."""
-    return re.sub(r"xox[bp]-[a-zA-Z0-9-]+", "xox*-****", str(text))
+    """Mask any xoxp-/xoxb-/xapp- tokens in text."""
+    text = re.sub(r"xox[bp]-[a-zA-Z0-9-]+", "xox*-****", str(text))
+    return re.sub(r"xapp-[a-zA-Z0-9-]+", "xapp-****", text)
 
 
 def get_client() -> WebClient:
@@ -6,6 +6,7 @@ from slack_sdk.errors import SlackApiError
 from slackasme.client import get_client, handle_api_error
 from slackasme.formatters import format_channels, output_json
 from slackasme.logging import logger
+from slackasme.utils.concurrency import map_concurrent
 from slackasme.utils.resolution import paginate_until
 from slackasme.validators import DEFAULT_LIMIT, validate_channel, validate_limit
 
@@ -16,47 +17,67 @@ def channel():
     pass
 
 
+# --type choices and their conversations.list types values
+CHANNEL_TYPES = {
+    "public": "public_channel",
+    "private": "private_channel",
+    "mpim": "mpim",
+    "im": "im",
+}
+
+
 @channel.command("list")
 @click.option(
     "--type",
-    "channel_type",
-    type=click.Choice(["public", "private", "mpim", "im"]),
-    default="public",
-    help="Channel type to list",
+    "channel_types",
+    type=click.Choice([*CHANNEL_TYPES, "all"]),
+    multiple=True,
+    default=["public"],
+    help="Channel type to list (repeat for several, or all)",
 )
 @click.option("--limit", "-n", default=DEFAULT_LIMIT, callback=validate_limit, help="Max channels")
 @click.option("--json", "as_json", is_flag=True, help="Output as JSON")
-def list_channels(channel_type, limit, as_json):
+def list_channels(channel_types, limit, as_json):
     """List channels.
 
+    With several --type values (or all), each type is paginated
+    concurrently and the results are merged with duplicates removed and
+    a Type column added; --limit then applies to each type.
+
     Examples:
         slack channel list
         slack channel list --type private
+        slack channel list --type public --type private
+        slack channel list --type all
         slack channel list --limit 500  # Paginates automatically
     """
+    types = list(CHANNEL_TYPES) if "all" in channel_types else list(dict.fromkeys(channel_types))
     client = get_client()
-    logger.info(f"Fetching up to {limit} {channel_type} channels")
-
-    # Map type to API types parameter
-    type_map = {
-        "public": "public_channel",
-        "private": "private_channel",
-        "mpim": "mpim",
-        "im": "im",
-    }
+    logger.info(f"Fetching up to {limit} {'/'.join(types)} channels")
 
-    try:
-        channels = paginate_until(
+    def fetch(channel_type):
+        return paginate_until(
             client.conversations_list,
             "channels",
             limit=limit,
-            types=type_map[channel_type],
+            types=CHANNEL_TYPES[channel_type],
         )
 
+    try:
+        if len(types) == 1:
+            channels = fetch(types[0])
+        else:
+            # The same conversation can come back under two types (e.g. mpim and private)
+            merged = {}
+            for page in map_concurrent(fetch, types, max_workers=len(types)):
+                for chan in page:
+                    merged.setdefault(chan["id"], chan)
+            channels = list(merged.values())
+
         if as_json:
             output_json({"channels": channels})
         else:
-            format_channels(channels)
+            format_channels(channels, show_type=len(types) > 1)
 
     except SlackApiError as e:
         handle_api_error(e)
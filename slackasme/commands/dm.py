@@ -1,12 +1,30 @@
 """DM commands."""
 
+import json
+import sys
+
 import click
 from slack_sdk.errors import SlackApiError
 
 from slackasme.client import get_client, handle_api_error
-from slackasme.formatters import output_json
+from slackasme.formatters import format_dms, output_json
 from slackasme.logging import logger
-from slackasme.utils.resolution import resolve_user, resolve_users
+from slackasme.utils.cache import USER_DIRECTORY_TTL, DMCache, UserDirectory
+from slackasme.utils.concurrency import (
+    POST_MESSAGE_PER_WORKSPACE,
+    TIER_3,
+    RateLimiter,
+    map_concurrent,
+)
+from slackasme.utils.resolution import (
+    hydrate_users,
+    list_dm_conversations,
+    open_dm,
+    record_dm_conversations,
+    resolve_user_ids,
+    sync_dm_channels,
+)
+from slackasme.validators import DEFAULT_CONCURRENCY, validate_concurrency, validate_text
 
 
 @click.group()
@@ -26,6 +44,10 @@ def open(users, as_json):
 
     USERS can be @username, email@domain.com, or U12345678.
 
+    Resolved users and the channel are cached, so opening the same DM
+    again makes no API calls. --json prints {"ok": true, "channel": ...};
+    a cached channel has only id, is_im and is_mpim.
+
     Examples:
         slack dm open @username
         slack dm open user@company.com
@@ -36,29 +58,17 @@ def open(users, as_json):
     logger.info(f"Opening DM with {users}")
 
     try:
-        if len(users) == 1:
-            # Single user - resolve and open DM
-            user = resolve_user(client, users[0])
-            if not user:
-                click.echo(f"User not found: {users[0]}", err=True)
-                return
-
-            response = client.conversations_open(users=user["id"])
-        else:
-            # Multiple users - resolve all and open group DM (mpim)
-            resolved, not_found = resolve_users(client, list(users))
-
-            if not_found:
-                click.echo(f"Users not found: {', '.join(not_found)}", err=True)
-                return
+        with DMCache() as cache:
+            channel, not_found = open_dm(client, list(users), cache)
 
-            user_ids = [u["id"] for u in resolved]
-            response = client.conversations_open(users=",".join(user_ids))
+        if not_found:
+            label = "User" if len(users) == 1 else "Users"
+            click.echo(f"{label} not found: {', '.join(not_found)}", err=True)
+            return
 
         if as_json:
-            output_json(response.data)
+            output_json({"ok": True, "channel": channel})
         else:
-            channel = response["channel"]
             click.echo(f"Channel ID: {channel['id']}")
             if channel.get("is_im"):
                 click.echo("Type: Direct Message")
@@ -67,3 +77,240 @@ def open(users, as_json):
 
     except SlackApiError as e:
         handle_api_error(e)
+
+
+@dm.command()
+@click.option(
+    "--concurrency",
+    default=DEFAULT_CONCURRENCY,
+    callback=validate_concurrency,
+    help="Group DM member lists fetched in parallel",
+)
+def sync(concurrency):
+    """Cache the channel IDs of all your open DMs and group DMs.
+
+    `dm open` and `message send @user` remember channels they have opened;
+    this fills the cache up front from conversations.list, so even first
+    sends skip conversations.open.
+
+    Examples:
+        slack dm sync
+    """
+    client = get_client()
+    logger.info("Caching DM channels")
+
+    try:
+        with DMCache() as cache:
+            count = sync_dm_channels(client, cache, max_workers=concurrency)
+        click.echo(f"Cached {count} DM channels")
+
+    except SlackApiError as e:
+        handle_api_error(e)
+
+
+@dm.command()
+@click.argument("text", callback=validate_text)
+@click.argument("users", nargs=-1)
+@click.option(
+    "--from-file",
+    "source",
+    type=click.File("r"),
+    help="Read recipients from a file (- for stdin), one per line",
+)
+@click.option(
+    "--output", "-o", type=click.File("w"), default="-", help="NDJSON results (default: stdout)"
+)
+@click.option(
+    "--concurrency",
+    default=DEFAULT_CONCURRENCY,
+    callback=validate_concurrency,
+    help="DMs opened and messages sent in parallel",
+)
+def broadcast(text, users, source, output, concurrency):
+    """Send the same message to many people, each in their own DM.
+
+    USERS (and --from-file lines) can be @username, email@domain.com, or
+    U12345678. Recipients are resolved in one batch (usernames in a
+    single users.list pass), DMs not already cached are opened in
+    parallel, then messages are sent in parallel, paced to the
+    conversations.open and chat.postMessage rate limits. Someone listed
+    twice (e.g. by name and email) gets one message. A cached DM that
+    Slack no longer accepts is reopened once.
+
+    One NDJSON result per recipient is written, including those that
+    could not be resolved or opened; the batch carries on past failures
+    and exits with status 1 if any occurred.
+
+    Examples:
+        slack dm broadcast "Office closed Friday" @alice @bob carol@company.com
+        slack dm broadcast "Please update your laptop" --from-file people.txt > results.ndjson
+    """
+    recipients = list(users)
+    if source:
+        recipients.extend(line.strip() for line in source if line.strip())
+    recipients = list(dict.fromkeys(recipients))
+    if not recipients:
+        raise click.UsageError("Give USERS or --from-file")
+
+    client = get_client()
+    sent = 0
+    failed = 0
+
+    def emit(result):
+        nonlocal sent, failed
+        output.write(json.dumps(result) + "\n")
+        output.flush()
+        if result["ok"]:
+            sent += 1
+        else:
+            failed += 1
+
+    try:
+        with DMCache() as cache:
+            user_ids = {r: cache.user_id(r) for r in recipients}
+            unknown = [r for r, user_id in user_ids.items() if not user_id]
+            logger.info(f"Resolving {len(unknown)} of {len(recipients)} recipients")
+            resolved, not_found = resolve_user_ids(client, unknown, max_workers=concurrency)
+            for identifier, user_id in resolved.items():
+                cache.record_user(identifier, user_id)
+            user_ids.update(resolved)
+
+            for identifier in not_found:
+                emit({"user": identifier, "ok": False, "error": "user_not_found"})
+
+            # One target per distinct user, in recipient order
+            targets = {}
+            for identifier in recipients:
+                if user_ids.get(identifier):
+                    targets.setdefault(user_ids[identifier], identifier)
+
+            channels = {}
+            to_open = []
+            for user_id in targets:
+                channel = cache.channel([user_id])
+                if channel:
+                    channels[user_id] = channel["id"]
+                else:
+                    to_open.append(user_id)
+
+            logger.info(f"Opening {len(to_open)} DMs ({len(channels)} cached)")
+            open_limiter = RateLimiter(TIER_3)
+
+            def open_one(user_id):
+                open_limiter.acquire()
+                try:
+                    return client.conversations_open(users=user_id)["channel"]["id"], None
+                except SlackApiError as e:
+                    return None, e.response.get("error", "unknown_error")
+
+            # Cache writes stay on this thread; results arrive in input order
+            for user_id, (channel_id, error) in zip(
+                to_open, map_concurrent(open_one, to_open, max_workers=concurrency)
+            ):
+                if error:
+                    result = {"user": targets[user_id], "user_id": user_id}
+                    emit({**result, "ok": False, "error": error})
+                else:
+                    channels[user_id] = channel_id
+                    cache.record_channel([user_id], channel_id, is_mpim=False)
+
+            send_limiter = RateLimiter(POST_MESSAGE_PER_WORKSPACE)
+            opened = set(to_open)
+
+            def send_one(item):
+                user_id, channel_id = item
+                result = {"user": targets[user_id], "user_id": user_id, "channel": channel_id}
+                send_limiter.acquire()
+                try:
+                    try:
+                        response = client.chat_postMessage(channel=channel_id, text=text)
+                    except SlackApiError as e:
+                        # A cached channel Slack no longer accepts is reopened once
+                        if e.response.get("error") != "channel_not_found" or user_id in opened:
+                            raise
+                        open_limiter.acquire()
+                        channel_id = client.conversations_open(users=user_id)["channel"]["id"]
+                        result["channel"] = channel_id
+                        send_limiter.acquire()
+                        response = client.chat_postMessage(channel=channel_id, text=text)
+                    result.update(ok=True, ts=response["ts"])
+                except SlackApiError as e:
+                    result.update(ok=False, error=e.response.get("error", "unknown_error"))
+                return result
+
+            logger.info(f"Sending to {len(channels)} DMs")
+            items = list(channels.items())
+            for (user_id, channel_id), result in zip(
+                items, map_concurrent(send_one, items, max_workers=concurrency)
+            ):
+                if result["channel"] != channel_id or result.get("error") == "channel_not_found":
+                    cache.forget_channel(channel_id)
+                if result["channel"] != channel_id and result["ok"]:
+                    cache.record_channel([user_id], result["channel"], is_mpim=False)
+                emit(result)
+
+    except SlackApiError as e:
+        handle_api_error(e)
+
+    click.echo(f"Sent: {sent}, failed: {failed}", err=True)
+    if failed:
+        sys.exit(1)
+
+
+@dm.command("list")
+@click.option(
+    "--concurrency",
+    default=DEFAULT_CONCURRENCY,
+    callback=validate_concurrency,
+    help="Group DM member lists and user lookups fetched in parallel",
+)
+@click.option("--json", "as_json", is_flag=True, help="Output as JSON")
+def list_dms(concurrency, as_json):
+    """List your DMs and group DMs with who they are with.
+
+    All peer IDs are collected first and named in one pass from the local
+    user directory (see `slack search users`), re-syncing it at most once,
+    so names cost no per-DM users.info calls. The DM channels are also
+    cached for `dm open` and `message send @user`.
+
+    Examples:
+        slack dm list
+        slack dm list --json
+    """
+    client = get_client()
+    logger.info("Listing DMs")
+
+    try:
+        conversations = list_dm_conversations(client, max_workers=concurrency)
+        with DMCache() as cache:
+            record_dm_conversations(cache, conversations)
+
+        peer_ids = {user_id for _, member_ids in conversations for user_id in member_ids}
+        with UserDirectory() as directory:
+            users = hydrate_users(
+                client, directory, peer_ids, ttl=USER_DIRECTORY_TTL, max_workers=concurrency
+            )
+
+        dms = [
+            {
+                **conversation,
+                "peers": [
+                    {
+                        "id": user_id,
+                        "name": users.get(user_id, {}).get("name"),
+                        "real_name": users.get(user_id, {}).get("real_name"),
+                    }
+                    for user_id in member_ids
+                ],
+            }
+            for conversation, member_ids in conversations
+        ]
+
+        if as_json:
+            output_json({"ok": True, "channels": dms})
+        else:
+            format_dms(dms)
+            click.echo(f"\nTotal: {len(dms)} DMs")
+
+    except SlackApiError as e:
+        handle_api_error(e)
@@ -1,78 +1,491 @@
 """File commands."""
 
+import math
 import os
+import sys
+import time
+from pathlib import Path
 
 import click
-from slack_sdk.errors import SlackApiError
+from slack_sdk.errors import SlackApiError, SlackRequestError
 
 from slackasme.client import get_client, handle_api_error
-from slackasme.formatters import format_files, output_json
+from slackasme.formatters import (
+    format_files,
+    format_size,
+    format_uploads,
+    output_json,
+    transfer_progress,
+)
 from slackasme.logging import logger
-from slackasme.validators import DEFAULT_LIMIT, validate_channel, validate_file_path, validate_limit
+from slackasme.utils.cache import UploadCache
+from slackasme.utils.checkpoint import Checkpoint
+from slackasme.utils.concurrency import TIER_3, RateLimiter, map_concurrent
+from slackasme.utils.download import download_file
+from slackasme.utils.resolution import USER_ID_PATTERN, iter_numbered_pages, resolve_user
+from slackasme.utils.upload import upload_files
+from slackasme.validators import (
+    DEFAULT_CONCURRENCY,
+    DEFAULT_LIMIT,
+    validate_channel,
+    validate_concurrency,
+    validate_date,
+    validate_duration,
+    validate_file_path,
+    validate_file_types,
+    validate_limit,
+    validate_optional_channel,
+)
+
+# files.list items per page
+FILES_PAGE_SIZE = 100
 
 
 @click.group()
 def file():
-    """Upload and list files."""
+    """Upload, download, list and delete files."""
     pass
 
 
+def _collect_files(paths: tuple, pattern: str) -> list[str]:
+    """Expand directories (matching `pattern`) and validate every file."""
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files.extend(str(p) for p in sorted(Path(path).glob(pattern)) if p.is_file())
+        else:
+            files.append(path)
+
+    if not files:
+        raise click.UsageError(f"No files matched {pattern!r}")
+
+    try:
+        return list(dict.fromkeys(validate_file_path(None, None, f) for f in files))
+    except click.BadParameter as e:
+        raise click.BadParameter(e.message, param_hint="PATHS") from None
+
+
+def _find_reusable(client, cache, files, digests, channel, ttl) -> list[dict]:
+    """Files whose content was already uploaded to the channel within the TTL."""
+    reused = []
+    for path in files:
+        file_id = cache.lookup(digests[path], channel, ttl)
+        if not file_id:
+            continue
+
+        try:
+            info = client.files_info(file=file_id)["file"]
+        except SlackApiError as e:
+            if e.response.get("error") not in ("file_not_found", "file_deleted"):
+                raise
+            logger.info(f"Cached upload {file_id} is gone, uploading {path} again")
+            cache.forget(digests[path], channel)
+            continue
+
+        reused.append(
+            {
+                "name": os.path.basename(path),
+                "path": path,
+                "id": file_id,
+                "permalink": info["permalink"],
+            }
+        )
+    return reused
+
+
 @file.command()
 @click.argument("channel", callback=validate_channel)
-@click.argument("filepath", callback=validate_file_path)
-@click.option("--message", "-m", help="Message to include with file")
+@click.argument("paths", nargs=-1, required=True, type=click.Path(exists=True))
+@click.option("--glob", "pattern", default="*", help="Files to take from directories")
+@click.option("--message", "-m", help="Message to include with the files")
+@click.option(
+    "--concurrency",
+    default=DEFAULT_CONCURRENCY,
+    callback=validate_concurrency,
+    help="Files uploaded in parallel",
+)
+@click.option(
+    "--dedupe-ttl",
+    default="24h",
+    callback=validate_duration,
+    help="Re-share identical files uploaded to the channel within this long (e.g. 12h, 7d)",
+)
+@click.option("--no-dedupe", is_flag=True, help="Always upload, even identical files")
 @click.option("--json", "as_json", is_flag=True, help="Output as JSON")
-def upload(channel, filepath, message, as_json):
-    """Upload a file to a channel.
+def upload(channel, paths, pattern, message, concurrency, dedupe_ttl, no_dedupe, as_json):
+    """Upload files to a channel, shared together in one message.
+
+    PATHS may be files or directories; directories contribute the files
+    matching --glob (use "**/*.log" to recurse). Files are streamed from
+    disk in parallel, with a progress bar on a terminal, then posted once
+    with the optional message.
+
+    Files whose content (SHA-256) was already uploaded to the same channel
+    within --dedupe-ttl are not uploaded again; the message links the
+    existing file instead. Unchanged files (same size and mtime) are not
+    re-hashed.
 
     Examples:
         slack file upload general /path/to/file.png
         slack file upload general /path/to/file.png --message "Screenshot"
+        slack file upload builds dist/ --glob "*.whl" -m "Build 1234 artifacts"
     """
+    files = _collect_files(paths, pattern)
     client = get_client()
-    filename = os.path.basename(filepath)
-    logger.info(f"Uploading {filename} to {channel}")
 
     try:
-        response = client.files_upload_v2(
-            channel=channel,
-            file=filepath,
-            filename=filename,
-            initial_comment=message,
-        )
+        with UploadCache() as cache:
+            digests = {} if no_dedupe else {f: cache.digest(f) for f in files}
+            reused = (
+                []
+                if no_dedupe
+                else _find_reusable(client, cache, files, digests, channel, dedupe_ttl)
+            )
+            reused_paths = {r["path"] for r in reused}
+            pending = [f for f in files if f not in reused_paths]
+            logger.info(f"Uploading {len(pending)} files to {channel} ({len(reused)} reused)")
+
+            # Reused files are shared by linking them in the same message
+            text = "\n".join([message or ""] + [r["permalink"] for r in reused]).strip() or None
+
+            uploads = []
+            started = time.monotonic()
+            if pending:
+                total = sum(os.path.getsize(f) for f in pending)
+                with transfer_progress(
+                    f"Uploading {len(pending)} files", total, not as_json
+                ) as advance:
+                    response, uploads = upload_files(
+                        client,
+                        pending,
+                        channel=channel,
+                        initial_comment=text,
+                        max_workers=concurrency,
+                        progress=advance,
+                    )
+                if not no_dedupe:
+                    for upload in uploads:
+                        cache.record(digests[upload["path"]], channel, upload["id"])
+            else:
+                response = client.chat_postMessage(channel=channel, text=text)
+            elapsed = time.monotonic() - started
 
         if as_json:
-            output_json(response.data)
+            output_json({**response.data, "uploads": uploads, "reused": reused, "seconds": elapsed})
         else:
-            file_info = response.get("file", {})
-            click.echo(f"Uploaded: {file_info.get('name', filename)}")
-            click.echo(f"File ID: {file_info.get('id', '-')}")
+            format_uploads(uploads, elapsed, reused)
 
     except SlackApiError as e:
         handle_api_error(e)
+    except SlackRequestError as e:
+        click.echo(f"Upload error: {e}", err=True)
+        sys.exit(1)
+
+
+def _destinations(infos: list, output_dir: str) -> list[str]:
+    """Local paths for downloads; names shared by several files get the file ID prefixed."""
+    names = [os.path.basename(info.get("name") or info["id"]) for info in infos]
+    return [
+        os.path.join(output_dir, f"{info['id']}-{name}" if names.count(name) > 1 else name)
+        for info, name in zip(infos, names)
+    ]
+
+
+@file.command()
+@click.argument("file_ids", nargs=-1)
+@click.option("--channel", callback=validate_optional_channel, help="Download every file here")
+@click.option(
+    "--output-dir",
+    "-o",
+    type=click.Path(file_okay=False),
+    default=".",
+    help="Directory to save files in",
+)
+@click.option(
+    "--concurrency",
+    default=DEFAULT_CONCURRENCY,
+    callback=validate_concurrency,
+    help="Files downloaded in parallel",
+)
+@click.option("--json", "as_json", is_flag=True, help="Output as JSON")
+def download(file_ids, channel, output_dir, concurrency, as_json):
+    """Download files by ID, or every file in a channel.
+
+    Downloads run in parallel. Each file is written to NAME.part and
+    renamed once its size matches Slack's; rerunning after an interruption
+    resumes partial files with HTTP Range requests and skips finished ones.
+    A file ID that can't be looked up is reported as failed without
+    stopping the others. Exits with status 1 if any download failed.
+
+    Examples:
+        slack file download F0123456789
+        slack file download F0123456789 F0987654321 -o downloads/
+        slack file download --channel builds -o artifacts/
+    """
+    if not file_ids and not channel:
+        raise click.UsageError("Give FILE_IDS or --channel")
+
+    client = get_client()
+
+    def lookup(file_id):
+        try:
+            return client.files_info(file=file_id)["file"], None
+        except SlackApiError as e:
+            return None, e.response.get("error", "unknown_error")
+
+    # A bad ID fails only itself, like a failed download
+    infos = []
+    lookup_failed = []
+    for file_id, (info, error) in zip(
+        file_ids, map_concurrent(lookup, file_ids, max_workers=concurrency)
+    ):
+        if error:
+            lookup_failed.append({"id": file_id, "name": None, "error": error})
+        else:
+            infos.append(info)
+
+    try:
+        if channel:
+            logger.info(f"Listing files in {channel}")
+            for response in iter_numbered_pages(
+                client.files_list,
+                page_size=FILES_PAGE_SIZE,
+                max_workers=concurrency,
+                channel=channel,
+            ):
+                infos.extend(response["files"])
+    except SlackApiError as e:
+        handle_api_error(e)
+
+    os.makedirs(output_dir, exist_ok=True)
+    logger.info(f"Downloading {len(infos)} files to {output_dir}")
+
+    total = sum(info.get("size", 0) for info in infos)
+    with transfer_progress(f"Downloading {len(infos)} files", total, not as_json) as advance:
+
+        def fetch(job):
+            info, dest = job
+            try:
+                return download_file(client, info, dest, progress=advance)
+            except SlackRequestError as e:
+                return {"id": info["id"], "name": info.get("name"), "error": str(e)}
+
+        jobs = list(zip(infos, _destinations(infos, output_dir)))
+        results = list(map_concurrent(fetch, jobs, max_workers=concurrency))
+
+    failed = lookup_failed + [result for result in results if "error" in result]
+    done = [result for result in results if "error" not in result]
+
+    if as_json:
+        output_json({"downloaded": done, "failed": failed})
+    else:
+        for result in done:
+            click.echo(f"{result['status'].capitalize()}: {result['path']}")
+        for result in failed:
+            click.echo(f"Failed {result['id']}: {result['error']}", err=True)
+        click.echo(f"Downloaded {len(done)} files ({format_size(total)}), failed: {len(failed)}")
+
+    if failed:
+        sys.exit(1)
+
+
+def _file_filters(client, channel, since, until, types, user) -> dict:
+    """files.list filter arguments, resolving --user to an ID."""
+    filters = {"channel": channel, "types": types}
+    if since:
+        filters["ts_from"] = int(float(since))
+    if until:
+        filters["ts_to"] = int(float(until))
+    if user and USER_ID_PATTERN.match(user):
+        filters["user"] = user
+    elif user:
+        found = resolve_user(client, user)
+        if not found:
+            raise click.BadParameter(f"User not found: {user}", param_hint="--user")
+        filters["user"] = found["id"]
+    return filters
 
 
 @file.command("list")
 @click.argument("channel", callback=validate_channel)
 @click.option("--limit", "-n", default=DEFAULT_LIMIT, callback=validate_limit, help="Max files")
+@click.option("--all", "fetch_all", is_flag=True, help="List every matching file (ignores --limit)")
+@click.option("--from", "since", callback=validate_date, help="Only files after this date")
+@click.option("--to", "until", callback=validate_date, help="Only files before this date")
+@click.option("--types", callback=validate_file_types, help="Only these types (e.g. images,pdfs)")
+@click.option("--user", help="Only files from this user (ID, @username or email)")
+@click.option(
+    "--concurrency",
+    default=DEFAULT_CONCURRENCY,
+    callback=validate_concurrency,
+    help="Pages fetched in parallel",
+)
 @click.option("--json", "as_json", is_flag=True, help="Output as JSON")
-def list_files(channel, limit, as_json):
+def list_files(channel, limit, fetch_all, since, until, types, user, concurrency, as_json):
     """List files in a channel.
 
+    Filters are applied by Slack, so only matching files are transferred.
+    files.list reports its page count up front, so after the first page
+    the rest are fetched in parallel (results stay in order).
+
     Examples:
         slack file list general
         slack file list general --limit 20
+        slack file list builds --types zips --from 2024-01-01 --all
+        slack file list general --user @johnson --types images,pdfs
     """
     client = get_client()
     logger.info(f"Fetching files from {channel}")
 
     try:
-        response = client.files_list(channel=channel, count=limit)
+        filters = _file_filters(client, channel, since, until, types, user)
+        files = []
+        for response in iter_numbered_pages(
+            client.files_list,
+            page_size=FILES_PAGE_SIZE,
+            max_pages=None if fetch_all else math.ceil(limit / FILES_PAGE_SIZE),
+            max_workers=concurrency,
+            **filters,
+        ):
+            files.extend(response["files"])
+        if not fetch_all:
+            files = files[:limit]
+
+        if as_json:
+            output_json({"ok": True, "files": files})
+        else:
+            format_files(files)
+
+    except SlackApiError as e:
+        handle_api_error(e)
+
+
+@file.command()
+@click.option("--channel", callback=validate_optional_channel, help="Only files in this channel")
+@click.option(
+    "--older-than", callback=validate_duration, help="Only files older than this (e.g. 30d)"
+)
+@click.option("--types", callback=validate_file_types, help="Only these types (e.g. zips,pdfs)")
+@click.option("--mine", is_flag=True, help="Only files you uploaded")
+@click.option("--dry-run", is_flag=True, help="Count matching files and bytes without deleting")
+@click.option("--yes", "-y", is_flag=True, help="Don't ask for confirmation")
+@click.option(
+    "--concurrency",
+    default=DEFAULT_CONCURRENCY,
+    callback=validate_concurrency,
+    help="Parallel deletes (still capped by the files.delete rate limit)",
+)
+@click.option("--json", "as_json", is_flag=True, help="Output as JSON")
+def purge(channel, older_than, types, mine, dry_run, yes, concurrency, as_json):
+    """Delete files in bulk.
+
+    Matching files are found with files.list's own filters and deleted in
+    parallel, paced to the files.delete rate limit (Tier 3, ~50/min).
+    Files are worked through newest to oldest and progress is
+    checkpointed after every page, so rerunning the same command after an
+    interruption resumes where it stopped.
+
+    Deleting other people's files needs admin rights; those failures are
+    reported and the exit status is 1.
+
+    Examples:
+        slack file purge --channel builds --older-than 30d --dry-run
+        slack file purge --channel builds --older-than 30d --types zips --yes
+        slack file purge --older-than 90d --mine
+    """
+    client = get_client()
+
+    try:
+        filters = {"channel": channel, "types": types}
+        if mine:
+            filters["user"] = client.auth_test()["user_id"]
+        cutoff = int(time.time()) - (older_than or 0)
+
+        if dry_run:
+            count = size = 0
+            for response in iter_numbered_pages(
+                client.files_list,
+                page_size=FILES_PAGE_SIZE,
+                max_workers=concurrency,
+                ts_to=cutoff,
+                **filters,
+            ):
+                count += len(response["files"])
+                size += sum(f.get("size", 0) for f in response["files"])
+
+            if as_json:
+                output_json({"count": count, "bytes": size})
+            else:
+                click.echo(f"Would delete {count} files ({format_size(size)})")
+            return
+
+        if not yes:
+            click.confirm("Delete all matching files?", abort=True)
+
+        checkpoint = Checkpoint(
+            "file-purge",
+            {"channel": channel, "older_than": older_than, "types": types, "mine": mine},
+        )
+        state = checkpoint.load()
+        if state:
+            logger.info(f"Resuming file purge from {state['ts_to']}")
+
+        limiter = RateLimiter(TIER_3)
+
+        def delete_one(f):
+            limiter.acquire()
+            try:
+                client.files_delete(file=f["id"])
+                return None
+            except SlackApiError as e:
+                error = e.response.get("error")
+                # Already gone (e.g. deleted before an interrupted run was resumed)
+                return None if error in ("file_not_found", "file_deleted") else error
+
+        ts_to = state.get("ts_to", cutoff)
+        deleted = state.get("deleted", 0)
+        reclaimed = state.get("bytes", 0)
+        failed = []
+        seen = set()
+
+        # Deleted files drop out of the listing, so always read the first page
+        # and move ts_to down past what has been handled (keyset pagination)
+        while True:
+            page = client.files_list(page=1, count=FILES_PAGE_SIZE, ts_to=ts_to, **filters)
+            files = [f for f in page["files"] if f["id"] not in seen]
+            if not files:
+                # A full page of already-seen files all created in one second
+                if len(page["files"]) == FILES_PAGE_SIZE:
+                    ts_to -= 1
+                    continue
+                break
+
+            for f, error in zip(files, map_concurrent(delete_one, files, max_workers=concurrency)):
+                seen.add(f["id"])
+                if error:
+                    failed.append({"id": f["id"], "name": f.get("name"), "error": error})
+                else:
+                    deleted += 1
+                    reclaimed += f.get("size", 0)
+
+            # ts_to is inclusive, so files sharing the oldest second are fetched again
+            ts_to = min(f["created"] for f in files)
+            checkpoint.save({"ts_to": ts_to, "deleted": deleted, "bytes": reclaimed})
+            logger.info(f"Deleted {deleted} files so far")
+
+        checkpoint.clear()
 
         if as_json:
-            output_json(response.data)
+            output_json({"deleted": deleted, "bytes": reclaimed, "failed": failed})
         else:
-            format_files(response["files"])
+            click.echo(f"Deleted {deleted} files ({format_size(reclaimed)})")
+            for failure in failed:
+                click.echo(
+                    f"Failed {failure['id']} ({failure['name']}): {failure['error']}", err=True
+                )
+
+        if failed:
+            sys.exit(1)
 
     except SlackApiError as e:
         handle_api_error(e)
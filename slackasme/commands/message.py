@@ -1,14 +1,45 @@
 """Message commands."""
 
+import json
+import re
+import sys
+import threading
+import time
+from itertools import islice
+
 import click
 from slack_sdk.errors import SlackApiError
 
 from slackasme.client import get_client, handle_api_error
-from slackasme.formatters import format_messages, output_json
+from slackasme.config import load_app_token
+from slackasme.formatters import format_message_line, format_messages, output_json
 from slackasme.logging import logger
+from slackasme.utils.archive import open_archive
+from slackasme.utils.cache import DMCache
+from slackasme.utils.checkpoint import Checkpoint
+from slackasme.utils.concurrency import (
+    POST_MESSAGE_PER_CHANNEL,
+    TIER_3,
+    RateLimiter,
+    map_concurrent,
+)
+from slackasme.utils.events import SocketModeTail
+from slackasme.utils.history import iter_merged_history
+from slackasme.utils.resolution import iter_pages, open_dm, paginate_until
+from slackasme.utils.tail import (
+    DEFAULT_POLL_BUDGET,
+    MAX_POLL_INTERVAL,
+    MIN_POLL_INTERVAL,
+    ChannelTail,
+    TailScheduler,
+)
 from slackasme.validators import (
+    DEFAULT_CONCURRENCY,
     DEFAULT_LIMIT,
     validate_channel,
+    validate_channels,
+    validate_concurrency,
+    validate_date,
     validate_limit,
     validate_text,
     validate_timestamp,
@@ -29,6 +60,9 @@ def message():
 def send(channel, text, thread, as_json):
     """Send a message to a channel or user.
 
+    For @username, the DM channel is looked up in the local DM cache (see
+    `slack dm open`), so repeat DMs are a single chat.postMessage call.
+
     Examples:
         slack message send general "Hello team!"
         slack message send @username "Direct message"
@@ -38,7 +72,10 @@ def send(channel, text, thread, as_json):
     logger.info(f"Sending message to {channel}")
 
     try:
-        response = client.chat_postMessage(channel=channel, text=text, thread_ts=thread)
+        if channel.startswith("@"):
+            response = _send_dm(client, channel, text, thread)
+        else:
+            response = client.chat_postMessage(channel=channel, text=text, thread_ts=thread)
 
         if as_json:
             output_json(response.data)
@@ -49,22 +86,192 @@ def send(channel, text, thread, as_json):
         handle_api_error(e)
 
 
+def _send_dm(client, user, text, thread):
+    """Post to a user's DM channel, reopening it once if a cached channel is rejected."""
+    with DMCache() as cache:
+        channel, not_found = open_dm(client, [user], cache)
+        if not_found:
+            raise click.BadParameter(f"User not found: {user}", param_hint="CHANNEL")
+
+        try:
+            return client.chat_postMessage(channel=channel["id"], text=text, thread_ts=thread)
+        except SlackApiError as e:
+            if e.response.get("error") != "channel_not_found":
+                raise
+            cache.forget_channel(channel["id"])
+            channel, _ = open_dm(client, [user], cache)
+            return client.chat_postMessage(channel=channel["id"], text=text, thread_ts=thread)
+
+
+def _parse_batch_record(line: str) -> dict:
+    """Parse and validate one send-batch NDJSON record."""
+    try:
+        record = json.loads(line)
+    except json.JSONDecodeError as e:
+        raise click.BadParameter(f"Invalid JSON: {e}") from None
+
+    if not isinstance(record, dict):
+        raise click.BadParameter("Record must be a JSON object")
+
+    for field in ("channel", "text", "thread"):
+        value = record.get(field)
+        if value is not None and not isinstance(value, str):
+            raise click.BadParameter(f'"{field}" must be a string')
+
+    validate_channel(None, None, record.get("channel"))
+    validate_text(None, None, record.get("text"))
+    validate_timestamp(None, None, record.get("thread"))
+    return record
+
+
+@message.command("send-batch")
+@click.argument("source", type=click.File("r"), default="-")
+@click.option(
+    "--output", "-o", type=click.File("w"), default="-", help="NDJSON results (default: stdout)"
+)
+@click.option("--retry-file", type=click.Path(dir_okay=False), help="Write failed records here")
+@click.option(
+    "--concurrency",
+    default=DEFAULT_CONCURRENCY,
+    callback=validate_concurrency,
+    help="Channels sent to in parallel",
+)
+def send_batch(source, output, retry_file, concurrency):
+    """Send many messages from NDJSON records.
+
+    SOURCE is a file (or - for stdin) with one {"channel", "text", "thread"}
+    object per line. Different channels are sent to in parallel; messages
+    to the same channel go out in order, about one per second.
+
+    One result per record is written as NDJSON. Failed records are written
+    to --retry-file unchanged, so a rerun with that file only sends what's
+    missing. Exits with status 1 if anything failed.
+
+    Examples:
+        slack message send-batch messages.ndjson
+        deploy-notices | slack message send-batch --retry-file failed.ndjson
+        slack message send-batch failed.ndjson --retry-file failed.ndjson
+    """
+    client = get_client()
+    lock = threading.Lock()
+    failed = []
+    sent = 0
+
+    def emit(line_no, raw, result):
+        nonlocal sent
+        with lock:
+            output.write(json.dumps({"line": line_no, **result}) + "\n")
+            output.flush()
+            if result["ok"]:
+                sent += 1
+            else:
+                failed.append((line_no, raw))
+
+    # Group by channel: sends within a channel are serialized and rate limited
+    by_channel = {}
+    for line_no, raw in enumerate(source, start=1):
+        raw = raw.strip()
+        if not raw:
+            continue
+        try:
+            record = _parse_batch_record(raw)
+        except click.BadParameter as e:
+            emit(line_no, raw, {"ok": False, "error": e.message})
+            continue
+        by_channel.setdefault(record["channel"].lstrip("#"), []).append((line_no, raw, record))
+
+    def send_channel(records):
+        limiter = RateLimiter(POST_MESSAGE_PER_CHANNEL)
+        for line_no, raw, record in records:
+            limiter.acquire()
+            result = {"channel": record["channel"]}
+            try:
+                response = client.chat_postMessage(
+                    channel=record["channel"], text=record["text"], thread_ts=record.get("thread")
+                )
+                result.update(ok=True, ts=response["ts"])
+            except SlackApiError as e:
+                result.update(ok=False, error=e.response.get("error", "unknown_error"))
+            emit(line_no, raw, result)
+
+    logger.info(f"Sending to {len(by_channel)} channels")
+    for _ in map_concurrent(send_channel, by_channel.values(), max_workers=concurrency):
+        pass
+
+    if retry_file:
+        with click.open_file(retry_file, "w") as f:
+            f.writelines(raw + "\n" for _, raw in sorted(failed))
+
+    click.echo(f"Sent: {sent}, failed: {len(failed)}", err=True)
+    if failed:
+        sys.exit(1)
+
+
 @message.command("list")
-@click.argument("channel", callback=validate_channel)
+@click.argument("channels", nargs=-1, required=True, callback=validate_channels)
 @click.option("--limit", "-n", default=DEFAULT_LIMIT, callback=validate_limit, help="Max messages")
-@click.option("--json", "as_json", is_flag=True, help="Output as JSON")
-def list_messages(channel, limit, as_json):
-    """List recent messages in a channel.
+@click.option("--since", callback=validate_date, help="Only messages after this date/timestamp")
+@click.option("--until", callback=validate_date, help="Only messages before this date/timestamp")
+@click.option("--local", is_flag=True, help="Read from the local archive (see: slack sync)")
+@click.option("--with-replies", is_flag=True, help="Include thread replies under each parent")
+@click.option(
+    "--concurrency",
+    default=DEFAULT_CONCURRENCY,
+    callback=validate_concurrency,
+    help="Parallel thread fetches (--with-replies) or channel page fetches",
+)
+@click.option(
+    "--json", "as_json", is_flag=True, help="Output as JSON (NDJSON with several channels)"
+)
+def list_messages(channels, limit, since, until, local, with_replies, concurrency, as_json):
+    """List recent messages in one or more channels.
+
+    With several channels, each channel's history is paged concurrently
+    and merged by time, newest first, streaming one line per message
+    with its channel and holding about one page per channel in memory.
+    --limit caps the merged total. Note that --json then prints NDJSON
+    (one message per line, with a "channel" field) instead of the single
+    JSON document printed for one channel.
 
     Examples:
         slack message list general
         slack message list general --limit 20
+        slack message list general --local
+        slack message list general --with-replies
+        slack message list deploys alerts incidents --since 2024-05-01T14:00
     """
+    if len(channels) > 1:
+        if local or with_replies:
+            raise click.UsageError("--local and --with-replies take a single channel")
+        _list_merged(channels, limit, since, until, concurrency, as_json)
+        return
+
+    channel = channels[0]
+    if local and with_replies:
+        raise click.UsageError("--with-replies is not available with --local")
+    if local and (since or until):
+        raise click.UsageError("--since and --until are not available with --local")
+
+    if local:
+        logger.info(f"Reading {limit} messages from {channel} in local archive")
+        with open_archive() as archive:
+            messages = archive.recent_messages(channel, limit)
+
+        if as_json:
+            output_json({"ok": True, "messages": messages})
+        else:
+            format_messages(messages)
+        return
+
     client = get_client()
     logger.info(f"Fetching {limit} messages from {channel}")
+    bounds = {key: value for key, value in (("oldest", since), ("latest", until)) if value}
 
     try:
-        response = client.conversations_history(channel=channel, limit=limit)
+        response = client.conversations_history(channel=channel, limit=limit, **bounds)
+
+        if with_replies:
+            attach_replies(client, channel, response["messages"], max_workers=concurrency)
 
         if as_json:
             output_json(response.data)
@@ -75,6 +282,154 @@ def list_messages(channel, limit, as_json):
         handle_api_error(e)
 
 
+def _list_merged(channels, limit, since, until, concurrency, as_json) -> None:
+    """Stream several channels' history merged newest first."""
+    client = get_client()
+    logger.info(f"Fetching {limit} messages from {', '.join(channels)}")
+
+    try:
+        merged = iter_merged_history(
+            client,
+            channels,
+            oldest=since,
+            latest=until,
+            page_size=min(limit, 200),
+            max_workers=concurrency,
+        )
+        for channel, msg in islice(merged, limit):
+            if as_json:
+                click.echo(json.dumps({**msg, "channel": channel}))
+            else:
+                format_message_line(msg, channel)
+
+    except SlackApiError as e:
+        handle_api_error(e)
+
+
+def attach_replies(client, channel, messages, *, max_workers=DEFAULT_CONCURRENCY) -> None:
+    """Fetch replies for threaded messages concurrently and nest them under "replies"."""
+    parents = [msg for msg in messages if msg.get("reply_count", 0) > 0]
+    logger.info(f"Fetching replies for {len(parents)} threads")
+
+    def fetch(parent):
+        replies = paginate_until(
+            client.conversations_replies, "messages", channel=channel, ts=parent["ts"]
+        )
+        # The first item is the parent itself
+        return [reply for reply in replies if reply["ts"] != parent["ts"]]
+
+    for parent, replies in zip(parents, map_concurrent(fetch, parents, max_workers=max_workers)):
+        parent["replies"] = replies
+
+
+@message.command()
+@click.argument("channels", nargs=-1, required=True, callback=validate_channels)
+@click.option(
+    "--backlog",
+    "-n",
+    default=10,
+    type=click.IntRange(0, 100),
+    help="Recent messages to show first (per channel)",
+)
+@click.option(
+    "--min-interval",
+    default=MIN_POLL_INTERVAL,
+    type=click.FloatRange(1.0),
+    help="Fastest poll interval in seconds (busy channel)",
+)
+@click.option(
+    "--max-interval",
+    default=MAX_POLL_INTERVAL,
+    type=click.FloatRange(1.0),
+    help="Slowest poll interval in seconds (quiet channel)",
+)
+@click.option(
+    "--budget",
+    default=DEFAULT_POLL_BUDGET,
+    type=click.FloatRange(1.0),
+    help="Polls per minute shared by all channels",
+)
+@click.option("--socket", is_flag=True, help="Receive events over Socket Mode instead of polling")
+@click.option("--json", "as_json", is_flag=True, help="Output as NDJSON (one message per line)")
+def tail(channels, backlog, min_interval, max_interval, budget, socket, as_json):
+    """Follow new messages in one or more channels.
+
+    Only messages newer than the last one seen are requested. Polling
+    speeds up while a channel is busy and backs off while it is quiet.
+    With several channels, one scheduler shares the --budget between
+    them in proportion to their recent activity, and output is merged
+    in chronological order. Press Ctrl+C to stop.
+
+    With --socket, messages are pushed over Socket Mode instead. This
+    needs an app-level token in SLACK_APP_TOKEN (app with Socket Mode and
+    message events enabled) and channel IDs. After any reconnect, missed
+    messages are backfilled from history.
+
+    Examples:
+        slack message tail general
+        slack message tail alerts --backlog 0 --json | jq .text
+        slack message tail alerts-db alerts-api alerts-web --budget 30
+        SLACK_APP_TOKEN=xapp-... slack message tail C12345678 --socket
+    """
+    client = get_client()
+    logger.info(f"Following {', '.join(channels)}")
+    show_channel = len(channels) > 1
+
+    def emit(items):
+        for channel, msg in items:
+            if as_json:
+                click.echo(json.dumps({**msg, "channel": channel}))
+            else:
+                format_message_line(msg, channel if show_channel else None)
+
+    if socket:
+        _tail_socket_mode(client, channels, backlog, emit)
+        return
+
+    try:
+        scheduler = TailScheduler(
+            [ChannelTail(client, channel) for channel in channels],
+            budget=budget,
+            min_interval=min_interval,
+            max_interval=max(min_interval, max_interval),
+        )
+        emit(scheduler.start(backlog))
+
+        while True:
+            time.sleep(scheduler.time_until_due())
+            emit(scheduler.poll_due())
+
+    except KeyboardInterrupt:
+        pass
+    except SlackApiError as e:
+        handle_api_error(e)
+
+
+def _tail_socket_mode(client, channels, backlog, emit) -> None:
+    """Run message tail on the Socket Mode backend until Ctrl+C."""
+    app_token = load_app_token()
+    if not app_token:
+        click.echo("Error: Socket Mode needs an app-level token in SLACK_APP_TOKEN", err=True)
+        sys.exit(1)
+
+    follower = SocketModeTail(
+        app_token, client, list(channels), lambda channel, msg: emit([(channel, msg)])
+    )
+
+    try:
+        follower.start(backlog)
+        # Events arrive on the socket client's threads
+        while True:
+            time.sleep(1)
+
+    except KeyboardInterrupt:
+        pass
+    except SlackApiError as e:
+        handle_api_error(e)
+    finally:
+        follower.close()
+
+
 @message.command()
 @click.argument("channel", callback=validate_channel)
 @click.argument("thread_ts", callback=validate_timestamp)
@@ -152,3 +507,132 @@ def delete(channel, timestamp, as_json):
 
     except SlackApiError as e:
         handle_api_error(e)
+
+
+def format_duration(seconds: float) -> str:
+    """Format a duration in seconds as e.g. 1h 5m 30s."""
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, secs = divmod(rest, 60)
+    if hours:
+        return f"{hours}h {minutes}m {secs}s"
+    if minutes:
+        return f"{minutes}m {secs}s"
+    return f"{secs}s"
+
+
+@message.command()
+@click.argument("channel", callback=validate_channel)
+@click.option("--since", callback=validate_date, help="Only messages after this date/timestamp")
+@click.option("--until", callback=validate_date, help="Only messages before this date/timestamp")
+@click.option("--match", "pattern", help="Only messages whose text matches this regex")
+@click.option("--dry-run", is_flag=True, help="Count matching messages without deleting")
+@click.option("--yes", "-y", is_flag=True, help="Don't ask for confirmation")
+@click.option(
+    "--concurrency",
+    default=DEFAULT_CONCURRENCY,
+    callback=validate_concurrency,
+    help="Parallel deletes (still capped by the chat.delete rate limit)",
+)
+@click.option("--json", "as_json", is_flag=True, help="Output as JSON")
+def purge(channel, since, until, pattern, dry_run, yes, concurrency, as_json):
+    """Delete your own messages in a channel.
+
+    History is streamed page by page and only messages authored by you
+    (the token owner) are deleted. Deletes run in parallel but are paced
+    to the chat.delete rate limit (Tier 3, ~50/min).
+
+    Progress is checkpointed after every page, so rerunning the same
+    command after an interruption resumes where it stopped. Thread
+    replies are not included.
+
+    Examples:
+        slack message purge general --since 2024-01-01 --dry-run
+        slack message purge general --since 2024-01-01 --until 2024-02-01
+        slack message purge general --match "^test" --yes
+    """
+    try:
+        regex = re.compile(pattern) if pattern else None
+    except re.error as e:
+        raise click.BadParameter(f"Invalid regex: {e}", param_hint="--match") from None
+
+    client = get_client()
+
+    try:
+        me = client.auth_test()["user_id"]
+        checkpoint = Checkpoint(
+            "purge", {"channel": channel, "since": since, "until": until, "match": pattern}
+        )
+        state = {} if dry_run else checkpoint.load()
+        if state:
+            logger.info(f"Resuming purge from {state['latest']}")
+
+        def mine(messages):
+            return [
+                msg
+                for msg in messages
+                if msg.get("user") == me and (not regex or regex.search(msg.get("text", "")))
+            ]
+
+        pages = iter_pages(
+            client.conversations_history,
+            channel=channel,
+            oldest=since,
+            latest=state.get("latest", until),
+        )
+
+        if dry_run:
+            count = sum(len(mine(response["messages"])) for response in pages)
+            estimate = format_duration(count * 60 / TIER_3)
+            if as_json:
+                output_json({"count": count, "estimated_seconds": count * 60 / TIER_3})
+            else:
+                click.echo(f"Would delete {count} messages (estimated {estimate})")
+            return
+
+        if not yes:
+            click.confirm(f"Delete all your matching messages in {channel}?", abort=True)
+
+        limiter = RateLimiter(TIER_3)
+
+        def delete_one(msg):
+            limiter.acquire()
+            try:
+                client.chat_delete(channel=channel, ts=msg["ts"])
+                return None
+            except SlackApiError as e:
+                error = e.response.get("error")
+                # Already gone (e.g. deleted before an interrupted run was resumed)
+                return None if error == "message_not_found" else error
+
+        deleted = state.get("deleted", 0)
+        failed = []
+        for response in pages:
+            messages = response["messages"]
+            targets = mine(messages)
+            for msg, error in zip(
+                targets, map_concurrent(delete_one, targets, max_workers=concurrency)
+            ):
+                if error:
+                    failed.append({"ts": msg["ts"], "error": error})
+                else:
+                    deleted += 1
+
+            if messages:
+                checkpoint.save({"latest": messages[-1]["ts"], "deleted": deleted})
+                logger.info(f"Deleted {deleted} messages so far")
+
+        checkpoint.clear()
+
+        if as_json:
+            output_json({"deleted": deleted, "failed": failed})
+        else:
+            click.echo(f"Deleted {deleted} messages")
+            for failure in failed:
+                click.echo(f"Failed {failure['ts']}: {failure['error']}", err=True)
+
+        if failed:
+            sys.exit(1)
+
+    except SlackApiError as e:
+        handle_api_error(e)
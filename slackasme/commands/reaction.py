@@ -1,12 +1,27 @@
 """Reaction commands."""
 
+import json
+import sys
+
 import click
 from slack_sdk.errors import SlackApiError
 
 from slackasme.client import get_client, handle_api_error
-from slackasme.formatters import output_json
+from slackasme.formatters import format_reaction_stats, output_json
 from slackasme.logging import logger
-from slackasme.validators import validate_channel, validate_emoji, validate_timestamp
+from slackasme.utils.cache import ReactionIndex
+from slackasme.utils.concurrency import TIER_3, RateLimiter, map_concurrent
+from slackasme.utils.resolution import iter_pages
+from slackasme.utils.stats import ReactionStats
+from slackasme.validators import (
+    DEFAULT_CONCURRENCY,
+    validate_channel,
+    validate_concurrency,
+    validate_date,
+    validate_emoji,
+    validate_limit,
+    validate_timestamp,
+)
 
 
 @click.group()
@@ -15,24 +30,123 @@ def reaction():
     pass
 
 
+def _parse_target(line: str) -> tuple[str, str]:
+    """
+    Parse one --from-file line into (channel, ts).
+
+    Accepts a search match as JSON ({"channel": {"id": ...}, "ts": ...},
+    as written by `slack search messages --ndjson`) or "CHANNEL TS".
+    """
+    if line.startswith("{"):
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise click.BadParameter(f"Invalid JSON: {e}") from None
+        channel = record.get("channel")
+        if isinstance(channel, dict):
+            channel = channel.get("id") or channel.get("name")
+        ts = record.get("ts")
+    else:
+        parts = line.split()
+        if len(parts) != 2:
+            raise click.BadParameter(f"Expected 'CHANNEL TS': {line}")
+        channel, ts = parts
+
+    if not isinstance(channel, str):
+        raise click.BadParameter("Missing or invalid channel")
+    if ts is not None and not isinstance(ts, str):
+        raise click.BadParameter("ts must be a string")
+
+    validate_channel(None, None, channel)
+    if not ts:
+        raise click.BadParameter("Missing ts")
+    validate_timestamp(None, None, ts)
+    return channel, ts
+
+
 @reaction.command()
-@click.argument("channel", callback=validate_channel)
-@click.argument("timestamp", callback=validate_timestamp)
-@click.argument("emoji", callback=validate_emoji)
+@click.argument("args", nargs=-1, required=True)
+@click.option(
+    "--from-file",
+    "source",
+    type=click.File("r"),
+    help="Read targets from a file (- for stdin): NDJSON search matches or 'CHANNEL TS' lines",
+)
+@click.option("--no-cache", is_flag=True, help="Don't skip reactions known to exist already")
+@click.option(
+    "--concurrency",
+    default=DEFAULT_CONCURRENCY,
+    callback=validate_concurrency,
+    help="Parallel requests (still capped by the reactions.add rate limit)",
+)
 @click.option("--json", "as_json", is_flag=True, help="Output as JSON")
-def add(channel, timestamp, emoji, as_json):
-    """Add a reaction to a message.
+def add(args, source, no_cache, concurrency, as_json):
+    """Add a reaction to one or more messages.
+
+    ARGS is CHANNEL TIMESTAMP [CHANNEL TIMESTAMP ...] EMOJI, or just EMOJI
+    with --from-file. Reactions you are already known to have (from earlier
+    runs) are skipped without an API call; the rest are added in parallel,
+    paced to the reactions.add rate limit (Tier 3, ~50/min).
+
+    With several targets, added/skipped/failed counts are reported and the
+    exit status is 1 if anything failed.
 
     Examples:
         slack reaction add general 1234567890.123456 eyes
-        slack reaction add general 1234567890.123456 white_check_mark
-        slack reaction add general 1234567890.123456 +1
+        slack reaction add general 1234567890.123456 general 1234567891.000100 +1
+        slack search messages "in:#alerts failed" --ndjson | slack reaction add eyes --from-file -
     """
+    *pairs, emoji = args
+    validate_emoji(None, None, emoji)
+    if len(pairs) % 2:
+        raise click.UsageError("Expected CHANNEL TIMESTAMP pairs followed by EMOJI")
+    if not pairs and not source:
+        raise click.UsageError("Give CHANNEL TIMESTAMP EMOJI, or EMOJI with --from-file")
+
+    targets = []
+    invalid = []
+    for channel, timestamp in zip(pairs[::2], pairs[1::2]):
+        try:
+            validate_channel(None, None, channel)
+            validate_timestamp(None, None, timestamp)
+        except click.BadParameter as e:
+            raise click.BadParameter(e.message, param_hint="ARGS") from None
+        targets.append((channel, timestamp))
+
+    if source:
+        for line_no, line in enumerate(source, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                targets.append(_parse_target(line))
+            except click.BadParameter as e:
+                invalid.append({"line": line_no, "error": e.message})
+
+    # The same message can appear more than once (e.g. overlapping searches)
+    targets = list(dict.fromkeys((channel.lstrip("#"), ts) for channel, ts in targets))
+
     client = get_client()
+
+    with ReactionIndex() as index:
+        if len(targets) == 1 and not source:
+            _add_one(client, index, *targets[0], emoji, no_cache, as_json)
+        else:
+            _add_many(client, index, targets, invalid, emoji, no_cache, concurrency, as_json)
+
+
+def _add_one(client, index, channel, timestamp, emoji, no_cache, as_json):
+    """Add a single reaction, keeping the original one-target output."""
+    if not no_cache and index.has(channel, timestamp, emoji):
+        logger.info(f"Skipping :{emoji}: on {channel}/{timestamp}: already reacted (cached)")
+        click.echo(f"Already reacted with :{emoji}:")
+        return
+
     logger.info(f"Adding :{emoji}: to {channel}/{timestamp}")
 
     try:
         response = client.reactions_add(channel=channel, timestamp=timestamp, name=emoji)
+        index.add(channel, timestamp, emoji)
 
         if as_json:
             output_json(response.data)
@@ -41,11 +155,61 @@ def add(channel, timestamp, emoji, as_json):
 
     except SlackApiError as e:
         if e.response.get("error") == "already_reacted":
+            index.add(channel, timestamp, emoji)
             click.echo(f"Already reacted with :{emoji}:")
         else:
             handle_api_error(e)
 
 
+def _add_many(client, index, targets, invalid, emoji, no_cache, concurrency, as_json):
+    """Add a reaction to many messages and report added/skipped/failed counts."""
+    pending = targets if no_cache else [t for t in targets if not index.has(*t, emoji)]
+    skipped = len(targets) - len(pending)
+    added = 0
+    failed = list(invalid)
+    logger.info(f"Adding :{emoji}: to {len(pending)} messages ({skipped} already reacted)")
+
+    limiter = RateLimiter(TIER_3)
+
+    def add_one(target):
+        channel, timestamp = target
+        limiter.acquire()
+        try:
+            client.reactions_add(channel=channel, timestamp=timestamp, name=emoji)
+            return None
+        except SlackApiError as e:
+            return e.response.get("error")
+
+    # Cache writes stay on this thread; results arrive here in input order
+    for (channel, timestamp), error in zip(
+        pending, map_concurrent(add_one, pending, max_workers=concurrency)
+    ):
+        if error and error != "already_reacted":
+            failed.append({"channel": channel, "ts": timestamp, "error": error})
+            continue
+
+        index.add(channel, timestamp, emoji)
+        if error:
+            skipped += 1
+        else:
+            added += 1
+
+    if as_json:
+        output_json({"added": added, "skipped": skipped, "failed": failed})
+    else:
+        click.echo(f"Added: {added}, skipped: {skipped}, failed: {len(failed)}")
+        for failure in failed:
+            where = (
+                f"line {failure['line']}"
+                if "line" in failure
+                else f"{failure['channel']}/{failure['ts']}"
+            )
+            click.echo(f"Failed {where}: {failure['error']}", err=True)
+
+    if failed:
+        sys.exit(1)
+
+
 @reaction.command()
 @click.argument("channel", callback=validate_channel)
 @click.argument("timestamp", callback=validate_timestamp)
@@ -73,3 +237,43 @@ def remove(channel, timestamp, emoji, as_json):
             click.echo(f"No :{emoji}: reaction to remove")
         else:
             handle_api_error(e)
+    finally:
+        with ReactionIndex() as index:
+            index.remove(channel, timestamp, emoji)
+
+
+@reaction.command()
+@click.argument("channel", callback=validate_channel)
+@click.option("--since", callback=validate_date, help="Only messages after this date/timestamp")
+@click.option("--until", callback=validate_date, help="Only messages before this date/timestamp")
+@click.option("--top", "-n", default=10, callback=validate_limit, help="Rows per table")
+@click.option("--json", "as_json", is_flag=True, help="Output as JSON")
+def stats(channel, since, until, top, as_json):
+    """Show the most used emoji and most active reacting users in a channel.
+
+    History is streamed page by page and only running counts are kept, so
+    long ranges don't need much memory. Skin tones are counted with their
+    base emoji. Thread replies are not included.
+
+    Examples:
+        slack reaction stats general --since 2024-01-01
+        slack reaction stats general --since 2024-01-01 --until 2024-04-01 --top 20
+    """
+    client = get_client()
+    logger.info(f"Collecting reaction stats for {channel}")
+
+    try:
+        totals = ReactionStats()
+        for response in iter_pages(
+            client.conversations_history, channel=channel, oldest=since, latest=until
+        ):
+            totals.add_messages(response["messages"])
+            logger.info(f"Scanned {totals.messages} messages")
+
+        if as_json:
+            output_json(totals.to_dict(top))
+        else:
+            format_reaction_stats(totals.to_dict(top))
+
+    except SlackApiError as e:
+        handle_api_error(e)
@@ -1,12 +1,39 @@
 """Search commands."""
 
+import json
+import math
+import re
+import time
+from datetime import datetime, timedelta
+
 import click
 from slack_sdk.errors import SlackApiError
 
 from slackasme.client import get_client, handle_api_error
-from slackasme.formatters import format_search_results, format_users, output_json
+from slackasme.formatters import (
+    format_search_context,
+    format_search_results,
+    format_users,
+    output_json,
+)
 from slackasme.logging import logger
-from slackasme.validators import DEFAULT_LIMIT, validate_limit, validate_search_query
+from slackasme.utils.archive import open_archive
+from slackasme.utils.cache import USER_DIRECTORY_TTL, SearchCache, UserDirectory
+from slackasme.utils.context import attach_context
+from slackasme.utils.resolution import iter_numbered_pages, sync_user_directory
+from slackasme.validators import (
+    DEFAULT_CONCURRENCY,
+    DEFAULT_LIMIT,
+    validate_concurrency,
+    validate_duration,
+    validate_limit,
+    validate_search_query,
+)
+
+# search.messages returns at most 100 matches per page
+SEARCH_PAGE_SIZE = 100
+# Modifiers that bound a search by date; cached queries with these are re-run in full
+DATE_MODIFIER_PATTERN = re.compile(r"\b(after|on|during):", re.IGNORECASE)
 
 
 @click.group()
@@ -18,8 +45,28 @@ def search():
 @search.command()
 @click.argument("query", callback=validate_search_query)
 @click.option("--limit", "-n", default=DEFAULT_LIMIT, callback=validate_limit, help="Max results")
+@click.option("--local", is_flag=True, help="Search the local archive (see: slack sync)")
+@click.option(
+    "--concurrency",
+    default=DEFAULT_CONCURRENCY,
+    callback=validate_concurrency,
+    help="Result pages fetched in parallel",
+)
+@click.option(
+    "--cache-ttl",
+    callback=validate_duration,
+    help="Reuse results cached within this long (e.g. 90s, 5m); older ones are topped up",
+)
+@click.option(
+    "--context",
+    "-C",
+    default=0,
+    type=click.IntRange(0, 100),
+    help="Messages to show before and after each match",
+)
 @click.option("--json", "as_json", is_flag=True, help="Output as JSON")
-def messages(query, limit, as_json):
+@click.option("--ndjson", is_flag=True, help="Output one match per line as JSON")
+def messages(query, limit, local, concurrency, cache_ttl, context, as_json, ndjson):
     """Search messages.
 
     Supports Slack search modifiers like:
@@ -28,58 +75,231 @@ def messages(query, limit, as_json):
     - before:2024-01-01
     - after:2024-01-01
 
+    With --local, from:@name is looked up in the local user directory
+    (filled by `slack search users`), and in:#channel matches a synced
+    channel by name or ID.
+
+    Slack returns at most 100 matches per page; for larger --limit values
+    the remaining pages are fetched in parallel after the first.
+
+    --ndjson output can be piped into `slack reaction add EMOJI --from-file -`.
+
+    With --cache-ttl, results are newest first and kept locally per query.
+    Within the TTL they are returned without calling Slack; after it, only
+    matches newer than the newest cached one are searched for (by adding
+    an after: date) and merged in. The cache age in seconds is shown
+    (cache_age in --json output).
+
+    --context N adds the N messages before and after each match (under
+    "context" in JSON). Matches close together in a channel are fetched as
+    one range, channels in parallel, and no message is shown twice.
+
     Examples:
         slack search messages "deployment issue"
         slack search messages "from:@johnson in:#general"
+        slack search messages "deploy* in:#ops after:2024-01-01" --local
+        slack search messages "in:#alerts deploy failed" --ndjson
+        slack search messages "in:#alerts failed" --cache-ttl 5m --json
+        slack search messages "in:#deploys rollback" --context 3
     """
+    if local and context:
+        raise click.UsageError("--context is not available with --local")
+
+    if local:
+        logger.info(f"Searching local archive: {query}")
+        try:
+            with open_archive() as archive:
+                matches = archive.search(query, limit)
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint="QUERY") from None
+
+        if ndjson:
+            _output_ndjson(matches)
+        elif as_json:
+            output_json({"ok": True, "messages": {"total": len(matches), "matches": matches}})
+        else:
+            format_search_results(matches)
+            click.echo(f"\nLocal matches: {len(matches)}")
+        return
+
     client = get_client()
     logger.info(f"Searching: {query}")
 
     try:
-        response = client.search_messages(query=query, count=limit)
+        cache_age = None
+        if cache_ttl is not None:
+            total, matches, cache_age = _cached_search(client, query, limit, concurrency, cache_ttl)
+        elif ndjson and not context:
+            for _, page in _iter_matches(client, query, limit, concurrency):
+                _output_ndjson(page)
+            return
+        else:
+            matches = []
+            total = 0
+            for total, page in _iter_matches(client, query, limit, concurrency):
+                matches.extend(page)
 
-        if as_json:
-            output_json(response.data)
+        if context:
+            logger.info(f"Fetching {context} messages of context around {len(matches)} matches")
+            attach_context(client, matches, context, max_workers=concurrency)
+
+        if ndjson:
+            _output_ndjson(matches)
+        elif as_json:
+            data = {"ok": True, "messages": {"total": total, "matches": matches}}
+            if cache_age is not None:
+                data["cache_age"] = round(cache_age)
+            output_json(data)
         else:
-            matches = response.get("messages", {}).get("matches", [])
-            format_search_results(matches)
-            total = response.get("messages", {}).get("total", 0)
-            click.echo(f"\nTotal matches: {total}")
+            if context:
+                format_search_context(matches)
+            else:
+                format_search_results(matches)
+            footer = f"\nTotal matches: {total}"
+            if cache_age is not None:
+                footer += f" (cached {round(cache_age)}s ago)"
+            click.echo(footer)
 
     except SlackApiError as e:
         handle_api_error(e)
 
 
+def _iter_matches(client, query: str, limit: int, concurrency: int, **kwargs):
+    """
+    Yield (total, matches) per search.messages page, in rank order, up to `limit` matches.
+
+    Page 1 gives the page count; the pages needed after it are fetched
+    concurrently. Extra kwargs (e.g. sort) are passed to search.messages.
+    """
+    remaining = limit
+    for response in iter_numbered_pages(
+        client.search_messages,
+        page_size=min(limit, SEARCH_PAGE_SIZE),
+        max_pages=math.ceil(limit / SEARCH_PAGE_SIZE),
+        max_workers=concurrency,
+        paging_key="messages",
+        query=query,
+        **kwargs,
+    ):
+        messages = response.get("messages", {})
+        page = messages.get("matches", [])[:remaining]
+        remaining -= len(page)
+        yield messages.get("total", 0), page
+
+        if remaining <= 0:
+            break
+
+
+def _cached_search(client, query: str, limit: int, concurrency: int, ttl: int):
+    """
+    Search through the local result cache.
+
+    Returns:
+        (total, matches newest first, seconds since the results were fetched)
+    """
+    with SearchCache() as cache:
+        entry = cache.get(query)
+        if entry and entry["max_results"] >= limit:
+            cache_age = time.time() - entry["fetched_at"]
+            if cache_age < ttl:
+                logger.debug(f"Serving cached results ({cache_age:.0f}s old)")
+                return entry["total"], entry["matches"][:limit], cache_age
+
+            after = _after_bound(query, entry["matches"])
+            if after:
+                logger.info(f"Refreshing cached results after:{after}")
+                max_results = entry["max_results"]
+                # Refreshed up to the entry's size, so a smaller --limit doesn't leave a gap
+                new_total, matches = _fetch_newest(
+                    client, f"{query} after:{after}", max_results, concurrency
+                )
+                if len(matches) >= max_results:
+                    # Every kept match is new; older cached ones may not follow on
+                    merged = matches
+                    since = (datetime.strptime(after, "%Y-%m-%d") + timedelta(days=1)).timestamp()
+                    overlap = sum(1 for m in entry["matches"] if float(m["ts"]) >= since)
+                    total = entry["total"] + new_total - overlap
+                else:
+                    cached = {_match_key(m) for m in entry["matches"]}
+                    added = [m for m in matches if _match_key(m) not in cached]
+                    new = {_match_key(m) for m in matches}
+                    merged = matches + [m for m in entry["matches"] if _match_key(m) not in new]
+                    merged = merged[:max_results]
+                    total = entry["total"] + len(added)
+                cache.put(query, max_results, total, merged)
+                return total, merged[:limit], 0.0
+
+        total, matches = _fetch_newest(client, query, limit, concurrency)
+        cache.put(query, limit, total, matches)
+        return total, matches, 0.0
+
+
+def _fetch_newest(client, query: str, limit: int, concurrency: int) -> tuple[int, list]:
+    """(total, up to `limit` matches newest first) from search.messages."""
+    total = 0
+    matches = []
+    for total, page in _iter_matches(
+        client, query, limit, concurrency, sort="timestamp", sort_dir="desc"
+    ):
+        matches.extend(page)
+    return total, matches
+
+
+def _after_bound(query: str, matches: list) -> str | None:
+    """
+    The after: date that covers everything newer than the newest cached match.
+
+    after: is exclusive and in the searcher's timezone, so it is set two days
+    before the newest match; the overlap is removed when merging. None means
+    a full search is needed: nothing is cached, or the query already has its
+    own date bounds.
+    """
+    if not matches or DATE_MODIFIER_PATTERN.search(query):
+        return None
+    newest = max(float(m["ts"]) for m in matches)
+    return (datetime.fromtimestamp(newest) - timedelta(days=2)).strftime("%Y-%m-%d")
+
+
+def _match_key(match: dict) -> tuple:
+    return match.get("channel", {}).get("id"), match.get("ts")
+
+
+def _output_ndjson(matches: list) -> None:
+    for match in matches:
+        click.echo(json.dumps(match))
+
+
 @search.command()
 @click.argument("query", callback=validate_search_query)
 @click.option("--limit", "-n", default=DEFAULT_LIMIT, callback=validate_limit, help="Max results")
+@click.option("--refresh", is_flag=True, help="Re-read the member list before searching")
 @click.option("--json", "as_json", is_flag=True, help="Output as JSON")
-def users(query, limit, as_json):
+def users(query, limit, refresh, as_json):
     """Search users by name.
 
+    Matches username, display name, real name and title, best match first.
+    Searches a local copy of the member list, which is read from Slack
+    (all pages) on first use, when older than a day, or with --refresh.
+
+    Typos are tolerated in names, but only looked for when the query
+    matches almost nobody as typed. In a large workspace, letter
+    sequences shared by thousands of names are ignored there, so a typo
+    in a very common name (e.g. "mohamed" for "mohammed") may find nothing.
+
     Examples:
         slack search users "johnson"
         slack search users "engineering"
+        slack search users "jhon smith" --refresh
     """
-    client = get_client()
     logger.info(f"Searching users: {query}")
 
     try:
-        # Slack doesn't have a direct user search API, so we list and filter
-        response = client.users_list(limit=1000)
-
-        query_lower = query.lower()
-        matches = [
-            u
-            for u in response["members"]
-            if not u.get("deleted")
-            and not u.get("is_bot")
-            and (
-                query_lower in u.get("name", "").lower()
-                or query_lower in u.get("real_name", "").lower()
-                or query_lower in u.get("profile", {}).get("title", "").lower()
-            )
-        ][:limit]
+        with UserDirectory() as directory:
+            if refresh or not directory.is_fresh(USER_DIRECTORY_TTL):
+                # Slack doesn't have a user search API, so we keep the full list locally
+                sync_user_directory(get_client(), directory)
+
+            matches = directory.search(query, limit)
 
         if as_json:
             output_json({"members": matches})
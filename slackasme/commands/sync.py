@@ -0,0 +1,43 @@
+"""Sync command."""
+
+import click
+from slack_sdk.errors import SlackApiError
+
+from slackasme.client import get_client, handle_api_error
+from slackasme.formatters import output_json
+from slackasme.logging import logger
+from slackasme.utils.archive import open_archive, sync_channel
+from slackasme.validators import validate_channels
+
+
+@click.command()
+@click.argument("channels", nargs=-1, required=True, callback=validate_channels)
+@click.option("--json", "as_json", is_flag=True, help="Output as JSON")
+def sync(channels, as_json):
+    """Sync channel history into the local archive.
+
+    Only messages newer than the last sync are fetched. The archive lives
+    in ~/.config/slackasme/archive.db and backs `message list --local`.
+
+    Examples:
+        slack sync general
+        slack sync general random C12345678
+    """
+    client = get_client()
+    results = []
+
+    try:
+        with open_archive() as archive:
+            for channel in channels:
+                logger.info(f"Syncing {channel}")
+                fetched, mark = sync_channel(client, archive, channel)
+                results.append({"channel": channel, "fetched": fetched, "high_water_mark": mark})
+
+                if not as_json:
+                    click.echo(f"{channel}: {fetched} new messages (up to {mark or '-'})")
+
+        if as_json:
+            output_json({"channels": results})
+
+    except SlackApiError as e:
+        handle_api_error(e)
@@ -35,6 +35,11 @@ def load_token() -> str | None:
     return None
 
 
+def load_app_token() -> str | None:
+    """Load the app-level token (xapp-) used for Socket Mode from env var."""
+    return os.environ.get("SLACK_APP_TOKEN")
+
+
 def delete_token() -> None:
     """Delete stored token."""
     if TOKEN_FILE.exists():
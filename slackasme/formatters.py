@@ -1,13 +1,25 @@
 """Output formatters."""
 
 import json
+from contextlib import contextmanager
 from datetime import datetime
 
 import click
 from rich.console import Console
+from rich.progress import (
+    BarColumn,
+    DownloadColumn,
+    Progress,
+    TextColumn,
+    TimeRemainingColumn,
+    TransferSpeedColumn,
+)
 from rich.table import Table
+from rich.text import Text
 
 console = Console()
+# Progress goes to stderr so stdout stays clean for piping
+err_console = Console(stderr=True)
 
 
 def output_json(data: dict) -> None:
@@ -28,17 +40,45 @@ def format_messages(messages: list) -> None:
     table.add_column("TS", style="dim", width=18)
 
     for msg in reversed(messages):  # Oldest first
-        ts = datetime.fromtimestamp(float(msg["ts"]))
-        time_str = ts.strftime("%H:%M:%S")
-        user = msg.get("user", msg.get("username", "bot"))
-        text = msg.get("text", "")[:100]  # Truncate long messages
+        _add_message_row(table, msg)
 
-        table.add_row(time_str, user, text, msg["ts"])
+        # Thread replies (from --with-replies) are nested under their parent
+        for reply in msg.get("replies", []):
+            _add_message_row(table, reply, prefix="↳ ")
 
     console.print(table)
 
 
-def format_channels(channels: list) -> None:
+def _add_message_row(table: Table, msg: dict, prefix: str = "") -> None:
+    """Add a single message row to a messages table."""
+    ts = datetime.fromtimestamp(float(msg["ts"]))
+    time_str = ts.strftime("%H:%M:%S")
+    user = msg.get("user", msg.get("username", "bot"))
+    text = msg.get("text", "")[:100]  # Truncate long messages
+
+    table.add_row(time_str, f"{prefix}{user}", f"{prefix}{text}", msg["ts"])
+
+
+def format_message_line(msg: dict, channel: str | None = None) -> None:
+    """Print one message as a single line (for streaming output)."""
+    ts = datetime.fromtimestamp(float(msg["ts"]))
+    user = msg.get("user", msg.get("username", "bot"))
+    prefix = f"#{channel.lstrip('#')} " if channel else ""
+    text = " ".join(msg.get("text", "").split())
+
+    click.echo(f"{ts.strftime('%H:%M:%S')} {prefix}{user}: {text}  ({msg['ts']})")
+
+
+def channel_type(chan: dict) -> str:
+    """A conversation's type as named by `channel list --type`."""
+    if chan.get("is_im"):
+        return "im"
+    if chan.get("is_mpim"):
+        return "mpim"
+    return "private" if chan.get("is_private") else "public"
+
+
+def format_channels(channels: list, show_type: bool = False) -> None:
     """Format channels as a table."""
     if not channels:
         click.echo("No channels found")
@@ -46,16 +86,45 @@ def format_channels(channels: list) -> None:
 
     table = Table(show_header=True, header_style="bold")
     table.add_column("ID", style="dim")
+    if show_type:
+        table.add_column("Type")
     table.add_column("Name")
     table.add_column("Members", justify="right")
     table.add_column("Purpose")
 
     for chan in channels:
-        table.add_row(
+        # DMs have no name, only the other user's ID
+        name = f"#{chan['name']}" if "name" in chan else chan.get("user", "-")
+        row = [
             chan["id"],
-            f"#{chan['name']}",
+            name,
             str(chan.get("num_members", "-")),
             chan.get("purpose", {}).get("value", "")[:50],
+        ]
+        if show_type:
+            row.insert(1, channel_type(chan))
+        table.add_row(*row)
+
+    console.print(table)
+
+
+def format_dms(conversations: list) -> None:
+    """Format DMs and group DMs (with a "peers" list of users) as a table."""
+    if not conversations:
+        click.echo("No DMs found")
+        return
+
+    table = Table(show_header=True, header_style="bold")
+    table.add_column("ID", style="dim")
+    table.add_column("Type")
+    table.add_column("With")
+
+    for conversation in conversations:
+        peers = ", ".join(f"@{peer.get('name') or peer['id']}" for peer in conversation["peers"])
+        table.add_row(
+            conversation["id"],
+            "Group DM" if conversation.get("is_mpim") else "DM",
+            peers,
         )
 
     console.print(table)
@@ -86,6 +155,15 @@ def format_users(users: list) -> None:
     console.print(table)
 
 
+def format_size(size: float) -> str:
+    """Human-readable byte count (B, KB, MB)."""
+    if size > 1024 * 1024:
+        return f"{size // 1024 // 1024:.0f}MB"
+    if size > 1024:
+        return f"{size // 1024:.0f}KB"
+    return f"{size:.0f}B"
+
+
 def format_files(files: list) -> None:
     """Format files as a table."""
     if not files:
@@ -99,19 +177,11 @@ def format_files(files: list) -> None:
     table.add_column("Size", justify="right")
 
     for f in files:
-        size = f.get("size", 0)
-        if size > 1024 * 1024:
-            size_str = f"{size // 1024 // 1024}MB"
-        elif size > 1024:
-            size_str = f"{size // 1024}KB"
-        else:
-            size_str = f"{size}B"
-
         table.add_row(
             f["id"],
             f.get("name", "")[:40],
             f.get("filetype", "-"),
-            size_str,
+            format_size(f.get("size", 0)),
         )
 
     console.print(table)
@@ -138,3 +208,103 @@ def format_search_results(matches: list) -> None:
         table.add_row(f"#{channel_name}", user, text, ts)
 
     console.print(table)
+
+
+def format_search_context(matches: list) -> None:
+    """Format search results with their surrounding messages (from --context)."""
+    if not matches:
+        click.echo("No results found")
+        return
+
+    table = Table(show_header=True, header_style="bold")
+    table.add_column("Time", style="dim", width=12)
+    table.add_column("User", width=15)
+    table.add_column("Message")
+    table.add_column("TS", style="dim", width=18)
+
+    for match in matches:
+        context = match.get("context", {})
+        channel_name = match.get("channel", {}).get("name", "-")
+        table.add_row("", "", f"[bold]#{channel_name}[/bold]", "")
+
+        for msg in context.get("before", []):
+            _add_message_row(table, msg, prefix="  ")
+        _add_message_row(table, match, prefix="» ")
+        for msg in context.get("after", []):
+            _add_message_row(table, msg, prefix="  ")
+        table.add_section()
+
+    console.print(table)
+
+
+def format_reaction_stats(stats: dict) -> None:
+    """Format reaction stats as top-emoji and top-user tables."""
+    click.echo(
+        f"{stats['reactions']} reactions on {stats['reacted_messages']}"
+        f" of {stats['messages']} messages"
+    )
+    if not stats["reactions"]:
+        return
+
+    emoji_table = Table(show_header=True, header_style="bold")
+    emoji_table.add_column("Emoji")
+    emoji_table.add_column("Count", justify="right")
+    for row in stats["emoji"]:
+        # Text() keeps the name literal instead of rendering known emoji codes
+        emoji_table.add_row(Text(f":{row['name']}:"), str(row["count"]))
+
+    users_table = Table(show_header=True, header_style="bold")
+    users_table.add_column("User")
+    users_table.add_column("Reactions", justify="right")
+    for row in stats["users"]:
+        users_table.add_row(row["user"], str(row["count"]))
+
+    console.print(emoji_table)
+    console.print(users_table)
+
+
+def format_uploads(uploads: list, seconds: float, reused: list = ()) -> None:
+    """Print one line per uploaded or re-shared file, plus a total for several uploads."""
+    for upload in reused:
+        click.echo(f"Reused: {upload['name']}  {upload['id']}  (identical file already shared)")
+
+    for upload in uploads:
+        rate = upload["size"] / upload["seconds"] if upload["seconds"] else upload["size"]
+        click.echo(
+            f"Uploaded: {upload['name']}  {upload['id']}  {format_size(upload['size'])}"
+            f" in {upload['seconds']:.1f}s ({format_size(rate)}/s)"
+        )
+
+    if len(uploads) > 1:
+        total = sum(upload["size"] for upload in uploads)
+        rate = total / seconds if seconds else total
+        click.echo(
+            f"Uploaded {len(uploads)} files ({format_size(total)}) in {seconds:.1f}s"
+            f" ({format_size(rate)}/s)"
+        )
+
+
+@contextmanager
+def transfer_progress(description: str, total: int, enabled: bool = True):
+    """
+    Show a byte-transfer progress bar on stderr while the block runs.
+
+    Yields an advance(n_bytes) callable that is safe to call from worker
+    threads. The bar is skipped when disabled or stderr is not a terminal,
+    and redraws at most a few times a second whatever the call rate.
+    """
+    progress = Progress(
+        TextColumn("{task.description}"),
+        BarColumn(),
+        DownloadColumn(),
+        TransferSpeedColumn(),
+        TimeRemainingColumn(),
+        console=err_console,
+        disable=not enabled or not err_console.is_terminal,
+        refresh_per_second=4,
+        transient=True,
+    )
+
+    with progress:
+        task = progress.add_task(description, total=total)
+        yield lambda n_bytes: progress.advance(task, n_bytes)
@@ -0,0 +1,404 @@
+"""Local SQLite archive of channel history.
+
+Messages are stored keyed by (channel, ts), channel being the name or ID
+the channel was synced by; a channels table maps that key to the
+channel's ID and name, so either finds its messages. Each channel also
+keeps a high-water mark - the newest ts synced so far - so a sync only
+asks Slack for messages newer than what is already on disk.
+
+Message text is indexed with FTS5. Triggers keep the index in step with
+every upsert, so it grows incrementally with each sync.
+"""
+
+import json
+import re
+import sqlite3
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from slackasme.config import get_config_dir
+from slackasme.logging import logger
+from slackasme.utils.cache import DMCache, UserDirectory
+from slackasme.utils.resolution import USER_ID_PATTERN, iter_pages
+
+ARCHIVE_FILENAME = "archive.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS messages (
+    channel TEXT NOT NULL,
+    ts TEXT NOT NULL,
+    user TEXT,
+    text TEXT NOT NULL DEFAULT '',
+    thread_ts TEXT,
+    data TEXT NOT NULL,
+    PRIMARY KEY (channel, ts)
+);
+
+CREATE INDEX IF NOT EXISTS messages_user ON messages (user, ts);
+
+CREATE TABLE IF NOT EXISTS sync_state (
+    channel TEXT PRIMARY KEY,
+    high_water_ts TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS channels (
+    channel TEXT PRIMARY KEY,
+    id TEXT,
+    name TEXT
+);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE messages_fts USING fts5(
+    text,
+    content = 'messages',
+    content_rowid = 'rowid',
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+
+CREATE TRIGGER messages_fts_insert AFTER INSERT ON messages BEGIN
+    INSERT INTO messages_fts (rowid, text) VALUES (new.rowid, new.text);
+END;
+
+CREATE TRIGGER messages_fts_delete AFTER DELETE ON messages BEGIN
+    INSERT INTO messages_fts (messages_fts, rowid, text) VALUES ('delete', old.rowid, old.text);
+END;
+
+CREATE TRIGGER messages_fts_update AFTER UPDATE OF text ON messages BEGIN
+    INSERT INTO messages_fts (messages_fts, rowid, text) VALUES ('delete', old.rowid, old.text);
+    INSERT INTO messages_fts (rowid, text) VALUES (new.rowid, new.text);
+END;
+"""
+
+# Slack-style search modifiers supported by local search
+SEARCH_MODIFIERS = ("from", "in", "before", "after")
+# modifier:value, "quoted phrase", or bare word
+QUERY_TOKEN_PATTERN = re.compile(r'(\w+):("[^"]*"|\S+)|"([^"]*)"|(\S+)')
+
+# ON CONFLICT ... DO UPDATE keeps the existing rowid, unlike INSERT OR REPLACE
+UPSERT_MESSAGE = """
+INSERT INTO messages (channel, ts, user, text, thread_ts, data)
+VALUES (?, ?, ?, ?, ?, ?)
+ON CONFLICT (channel, ts) DO UPDATE SET
+    user = excluded.user,
+    text = excluded.text,
+    thread_ts = excluded.thread_ts,
+    data = excluded.data
+"""
+
+
+def normalize_channel(channel: str) -> str:
+    """Normalize a channel argument so #general and general share a key."""
+    return channel.lstrip("#")
+
+
+class Archive:
+    """SQLite-backed message archive."""
+
+    def __init__(self, path: Path | str):
+        self.path = Path(path)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+        self._ensure_fts()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self) -> None:
+        """Close the underlying connection."""
+        self.conn.close()
+
+    def _ensure_fts(self) -> None:
+        """Create the full-text index, backfilling it from existing messages."""
+        exists = self.conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'messages_fts'"
+        ).fetchone()
+        if exists:
+            return
+
+        with self.conn:
+            self.conn.executescript(FTS_SCHEMA)
+            self.conn.execute("INSERT INTO messages_fts (messages_fts) VALUES ('rebuild')")
+
+    def high_water_mark(self, channel: str) -> str | None:
+        """Return the newest synced ts for a channel, or None if never synced."""
+        row = self.conn.execute(
+            "SELECT high_water_ts FROM sync_state WHERE channel = ?",
+            (normalize_channel(channel),),
+        ).fetchone()
+        return row["high_water_ts"] if row else None
+
+    def store_messages(self, channel: str, messages: list, high_water_ts: str | None = None) -> int:
+        """
+        Upsert a batch of messages in a single transaction.
+
+        Args:
+            channel: Channel the messages belong to
+            messages: Message dicts as returned by conversations.history
+            high_water_ts: If given, advance the channel's mark in the same transaction
+
+        Returns:
+            Number of messages written
+        """
+        channel = normalize_channel(channel)
+        rows = [
+            (
+                channel,
+                msg["ts"],
+                msg.get("user", msg.get("username")),
+                msg.get("text", ""),
+                msg.get("thread_ts"),
+                json.dumps(msg),
+            )
+            for msg in messages
+            if "ts" in msg
+        ]
+
+        with self.conn:
+            self.conn.executemany(UPSERT_MESSAGE, rows)
+            if high_water_ts:
+                # Slack timestamps are fixed-width, so text comparison orders them
+                self.conn.execute(
+                    """
+                    INSERT INTO sync_state (channel, high_water_ts) VALUES (?, ?)
+                    ON CONFLICT (channel) DO UPDATE SET
+                        high_water_ts = MAX(high_water_ts, excluded.high_water_ts)
+                    """,
+                    (channel, high_water_ts),
+                )
+
+        return len(rows)
+
+    def record_channel(self, channel: str, channel_id: str | None, name: str | None) -> None:
+        """Remember the ID and name of the channel synced as `channel`."""
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO channels (channel, id, name) VALUES (?, ?, ?)",
+                (normalize_channel(channel), channel_id, name),
+            )
+
+    def channel_keys(self, channel: str) -> list[str]:
+        """Keys a channel's messages are stored under, given its name, ID or sync key."""
+        channel = normalize_channel(channel)
+        rows = self.conn.execute(
+            "SELECT channel FROM channels WHERE ? IN (channel, id, name)", (channel,)
+        )
+        return sorted({channel, *(row["channel"] for row in rows)})
+
+    def user_ids(self, user: str) -> list[str]:
+        """
+        Values a from: modifier matches in the user column.
+
+        A user ID is used as is. A name is looked up in the local user
+        directory and the DM identifier cache; bot messages are stored
+        under their username, so the name itself is kept too.
+
+        Raises:
+            ValueError: If the name is unknown and no message is stored under it
+        """
+        if USER_ID_PATTERN.match(user):
+            return [user]
+
+        with UserDirectory() as directory:
+            ids = directory.ids_named(user)
+        with DMCache() as cache:
+            if cached := cache.user_id(user):
+                ids.append(cached)
+
+        if not ids and not self.conn.execute(
+            "SELECT 1 FROM messages WHERE user = ? LIMIT 1", (user,)
+        ).fetchone():
+            raise ValueError(
+                f"Unknown user: @{user} (the local user directory is filled by"
+                " `slack search users`; or use a user ID)"
+            )
+        return sorted({user, *ids})
+
+    def recent_messages(self, channel: str, limit: int) -> list[dict]:
+        """Return up to `limit` archived messages, newest first (like conversations.history)."""
+        keys = self.channel_keys(channel)
+        rows = self.conn.execute(
+            f"SELECT data FROM messages WHERE channel IN ({', '.join('?' * len(keys))})"
+            " ORDER BY ts DESC LIMIT ?",
+            (*keys, limit),
+        )
+        return [json.loads(row["data"]) for row in rows]
+
+    def search(self, query: str, limit: int) -> list[dict]:
+        """
+        Search archived messages.
+
+        Supports the same modifiers as Slack search: from:, in:, before:, after:.
+        from: takes a user ID or a name (see user_ids()), in: a channel's
+        name or ID once it has been synced. Remaining words (or "quoted
+        phrases") must all appear in the text; a trailing * matches a prefix.
+
+        Args:
+            query: Search query
+            limit: Max results
+
+        Returns:
+            Matches shaped like search.messages results, best match first
+
+        Raises:
+            ValueError: If a from: user is unknown or a date is malformed
+        """
+        terms, modifiers = parse_search_query(query)
+
+        clauses = []
+        params = []
+        if "from" in modifiers:
+            user_ids = self.user_ids(modifiers["from"])
+            clauses.append(f"m.user IN ({', '.join('?' * len(user_ids))})")
+            params.extend(user_ids)
+        if "in" in modifiers:
+            keys = self.channel_keys(modifiers["in"])
+            clauses.append(f"m.channel IN ({', '.join('?' * len(keys))})")
+            params.extend(keys)
+        if "before" in modifiers:
+            clauses.append("m.ts < ?")
+            params.append(modifiers["before"])
+        if "after" in modifiers:
+            clauses.append("m.ts >= ?")
+            params.append(modifiers["after"])
+
+        if terms:
+            sql = (
+                "SELECT m.channel, c.id, c.name, m.data FROM messages_fts"
+                " JOIN messages m ON m.rowid = messages_fts.rowid"
+                " LEFT JOIN channels c ON c.channel = m.channel"
+                " WHERE messages_fts MATCH ?"
+            )
+            params.insert(0, build_fts_query(terms))
+            order = "bm25(messages_fts)"
+        else:
+            sql = (
+                "SELECT m.channel, c.id, c.name, m.data FROM messages m"
+                " LEFT JOIN channels c ON c.channel = m.channel WHERE 1"
+            )
+            order = "m.ts DESC"
+
+        for clause in clauses:
+            sql += f" AND {clause}"
+        sql += f" ORDER BY {order} LIMIT ?"
+        params.append(limit)
+
+        matches = []
+        for row in self.conn.execute(sql, params):
+            channel = {"name": row["name"] or row["channel"]}
+            if row["id"]:
+                channel["id"] = row["id"]
+            matches.append({**json.loads(row["data"]), "channel": channel})
+        return matches
+
+
+def _date_to_ts(value: str, *, next_day: bool = False) -> str:
+    """Convert a YYYY-MM-DD date (local time) to a Slack ts string."""
+    try:
+        day = datetime.strptime(value, "%Y-%m-%d")
+    except ValueError:
+        raise ValueError(f"Invalid date: {value} (expected: YYYY-MM-DD)") from None
+
+    if next_day:
+        day += timedelta(days=1)
+    return f"{int(day.timestamp())}.000000"
+
+
+def parse_search_query(query: str) -> tuple[list[str], dict]:
+    """
+    Split a search query into free-text terms and modifiers.
+
+    Values are normalized for the archive: from:@name -> name,
+    in:#channel -> channel, and dates become Slack ts bounds. As in Slack,
+    before: excludes the given day and after: starts the day after it.
+
+    Raises:
+        ValueError: If a before:/after: date is malformed
+    """
+    terms = []
+    modifiers = {}
+
+    for match in QUERY_TOKEN_PATTERN.finditer(query):
+        key, value, phrase, word = match.groups()
+
+        if key and key.lower() in SEARCH_MODIFIERS:
+            key = key.lower()
+            value = value.strip('"')
+            if key == "from":
+                value = value.strip("<>").lstrip("@")
+            elif key == "in":
+                value = normalize_channel(value)
+            elif key == "before":
+                value = _date_to_ts(value)
+            elif key == "after":
+                value = _date_to_ts(value, next_day=True)
+            modifiers[key] = value
+        elif phrase is not None:
+            if phrase.strip():
+                terms.append(phrase)
+        else:
+            terms.append(word if word is not None else match.group(0))
+
+    return terms, modifiers
+
+
+def build_fts_query(terms: list[str]) -> str:
+    """Quote terms for FTS5 MATCH so user input is never parsed as query syntax."""
+    parts = []
+    for term in terms:
+        prefix = term.endswith("*") and len(term) > 1
+        quoted = '"' + term.rstrip("*").replace('"', '""') + '"'
+        parts.append(quoted + "*" if prefix else quoted)
+    return " ".join(parts)
+
+
+def open_archive() -> Archive:
+    """Open the archive in the config directory."""
+    return Archive(get_config_dir() / ARCHIVE_FILENAME)
+
+
+def sync_channel(client, archive: Archive, channel: str) -> tuple[int, str | None]:
+    """
+    Fetch messages newer than the channel's high-water mark into the archive.
+
+    Each page is upserted in its own transaction. The mark only advances once
+    every page has been stored, so an interrupted sync is simply retried from
+    the previous mark on the next run. The channel's current ID and name are
+    recorded too, for in: in local search.
+
+    Args:
+        client: Slack WebClient instance
+        archive: Archive to write to
+        channel: Channel to sync
+
+    Returns:
+        Tuple of (messages_fetched, new_high_water_mark)
+    """
+    info = client.conversations_info(channel=channel)["channel"]
+    archive.record_channel(channel, info.get("id"), info.get("name"))
+
+    mark = archive.high_water_mark(channel)
+    logger.debug(f"Syncing {channel} from {mark or 'the beginning'}")
+
+    kwargs = {"channel": channel}
+    if mark:
+        kwargs["oldest"] = mark
+
+    fetched = 0
+    newest = mark
+    for response in iter_pages(client.conversations_history, **kwargs):
+        messages = response["messages"]
+        fetched += archive.store_messages(channel, messages)
+        for msg in messages:
+            if newest is None or msg["ts"] > newest:
+                newest = msg["ts"]
+
+    if newest and newest != mark:
+        archive.store_messages(channel, [], high_water_ts=newest)
+
+    return fetched, newest
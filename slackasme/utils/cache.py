@@ -0,0 +1,542 @@
+"""Local caches that let commands skip redundant Slack API calls.
+
+All caches share one SQLite file (cache.db) in the config directory;
+each cache class declares and owns its own tables.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+
+from slackasme.config import get_config_dir
+
+CACHE_FILENAME = "cache.db"
+
+
+class SQLiteCache:
+    """Base class: a connection to the cache database plus the subclass schema."""
+
+    SCHEMA = ""
+
+    def __init__(self, path: Path | str | None = None):
+        self.path = Path(path) if path else get_config_dir() / CACHE_FILENAME
+        self.conn = sqlite3.connect(self.path)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(self.SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+class ReactionIndex(SQLiteCache):
+    """
+    Reactions the token owner is known to have on messages.
+
+    Filled from successful reactions.add calls and already_reacted errors and
+    cleared by reactions.remove, so repeated adds can be skipped locally.
+    Reactions removed in the Slack client are not seen; --no-cache bypasses it.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS reactions (
+        channel TEXT NOT NULL,
+        ts TEXT NOT NULL,
+        name TEXT NOT NULL,
+        PRIMARY KEY (channel, ts, name)
+    );
+    """
+
+    def has(self, channel: str, ts: str, name: str) -> bool:
+        """Return True if the reaction is known to exist."""
+        row = self.conn.execute(
+            "SELECT 1 FROM reactions WHERE channel = ? AND ts = ? AND name = ?",
+            (channel.lstrip("#"), ts, name),
+        ).fetchone()
+        return row is not None
+
+    def add(self, channel: str, ts: str, name: str) -> None:
+        """Record that the reaction exists."""
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO reactions (channel, ts, name) VALUES (?, ?, ?)",
+                (channel.lstrip("#"), ts, name),
+            )
+
+    def remove(self, channel: str, ts: str, name: str) -> None:
+        """Forget a reaction."""
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM reactions WHERE channel = ? AND ts = ? AND name = ?",
+                (channel.lstrip("#"), ts, name),
+            )
+
+
+class UploadCache(SQLiteCache):
+    """
+    Content hashes of uploaded files, for re-sharing instead of re-uploading.
+
+    Two tables: SHA-256 digests memoized by (path, size, mtime) so unchanged
+    files aren't re-hashed, and which file ID each digest was uploaded as
+    per channel, with the upload time for TTL checks.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS file_digests (
+        path TEXT PRIMARY KEY,
+        size INTEGER NOT NULL,
+        mtime_ns INTEGER NOT NULL,
+        sha256 TEXT NOT NULL
+    );
+
+    CREATE TABLE IF NOT EXISTS uploads (
+        sha256 TEXT NOT NULL,
+        channel TEXT NOT NULL,
+        file_id TEXT NOT NULL,
+        uploaded_at REAL NOT NULL,
+        PRIMARY KEY (sha256, channel)
+    );
+    """
+
+    def digest(self, path: str) -> str:
+        """SHA-256 of a file, reusing the stored digest if size and mtime are unchanged."""
+        stat = os.stat(path)
+        row = self.conn.execute(
+            "SELECT sha256 FROM file_digests WHERE path = ? AND size = ? AND mtime_ns = ?",
+            (path, stat.st_size, stat.st_mtime_ns),
+        ).fetchone()
+        if row:
+            return row["sha256"]
+
+        with open(path, "rb") as f:
+            sha256 = hashlib.file_digest(f, "sha256").hexdigest()
+
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO file_digests (path, size, mtime_ns, sha256)"
+                " VALUES (?, ?, ?, ?)",
+                (path, stat.st_size, stat.st_mtime_ns, sha256),
+            )
+        return sha256
+
+    def lookup(self, sha256: str, channel: str, ttl: float) -> str | None:
+        """File ID this content was uploaded as in `channel` within the last `ttl` seconds."""
+        row = self.conn.execute(
+            "SELECT file_id FROM uploads WHERE sha256 = ? AND channel = ? AND uploaded_at >= ?",
+            (sha256, channel.lstrip("#"), time.time() - ttl),
+        ).fetchone()
+        return row["file_id"] if row else None
+
+    def record(self, sha256: str, channel: str, file_id: str) -> None:
+        """Remember that this content was just uploaded to `channel`."""
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO uploads (sha256, channel, file_id, uploaded_at)"
+                " VALUES (?, ?, ?, ?)",
+                (sha256, channel.lstrip("#"), file_id, time.time()),
+            )
+
+    def forget(self, sha256: str, channel: str) -> None:
+        """Drop an upload record (e.g. the file was deleted in Slack)."""
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM uploads WHERE sha256 = ? AND channel = ?",
+                (sha256, channel.lstrip("#")),
+            )
+
+
+# Profile fields indexed by UserDirectory, in descending match weight
+USER_SEARCH_FIELDS = ("name", "display_name", "real_name", "title")
+USER_FIELD_WEIGHTS = {"name": 1.0, "display_name": 1.0, "real_name": 0.9, "title": 0.6}
+# Trigram overlap a fuzzy match needs to be returned at all
+MIN_TRIGRAM_SIMILARITY = 0.6
+# How long a synced user directory is used before users.list is read again
+USER_DIRECTORY_TTL = 24 * 60 * 60
+# Name fields: indexed for prefix lookups and used for fuzzy matching
+NAME_FIELDS = ("name", "display_name", "real_name")
+# Typos are only looked for when the cheaper lookups found fewer users than this
+TYPO_SEARCH_BELOW = 5
+# Trigrams in more names than this are too common to be worth reading for typos
+COMMON_TRIGRAM_ROWS = 2000
+
+
+def user_search_fields(user: dict) -> dict:
+    """The searchable fields of a users.list member, lower-cased."""
+    profile = user.get("profile", {})
+    return {
+        "name": user.get("name", "").lower(),
+        "display_name": profile.get("display_name", "").lower(),
+        "real_name": (user.get("real_name") or profile.get("real_name", "")).lower(),
+        "title": profile.get("title", "").lower(),
+    }
+
+
+def trigrams(text: str) -> set[str]:
+    """Character trigrams of a string, as the FTS5 trigram tokenizer splits it."""
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def fts_phrase(text: str) -> str:
+    """Quote text as an FTS5 phrase; with the trigram tokenizer it matches as a substring."""
+    return '"{}"'.format(text.replace('"', '""'))
+
+
+def score_user(query: str, fields: dict) -> float:
+    """
+    Rank a user against a lower-cased query; 0 means no match.
+
+    Per field: exact match 4, prefix of the field or of a word in it 3,
+    substring 2, otherwise the share of the query's trigrams the field
+    contains (typo tolerance). The best weighted field wins.
+    """
+    query_trigrams = trigrams(query)
+    best = 0.0
+    for field, value in fields.items():
+        if not value:
+            continue
+        if value == query:
+            score = 4.0
+        elif value.startswith(query) or f" {query}" in value:
+            score = 3.0
+        elif query in value:
+            score = 2.0
+        elif query_trigrams:
+            score = len(query_trigrams & trigrams(value)) / len(query_trigrams)
+            if score < MIN_TRIGRAM_SIMILARITY:
+                score = 0.0
+        else:
+            score = 0.0
+        best = max(best, score * USER_FIELD_WEIGHTS[field])
+    return best
+
+
+class UserDirectory(SQLiteCache):
+    """
+    Local copy of the workspace member list with a trigram index.
+
+    Filled by a full users.list pass (replace()), after which searches are
+    answered from SQLite: an FTS5 trigram index over name, display name,
+    real name and title yields candidates sharing trigrams with the query,
+    which are then ranked by score_user(). Queries under three characters
+    have no trigrams and only match name prefixes.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS users (
+        id TEXT PRIMARY KEY,
+        name TEXT NOT NULL DEFAULT '',
+        display_name TEXT NOT NULL DEFAULT '',
+        real_name TEXT NOT NULL DEFAULT '',
+        title TEXT NOT NULL DEFAULT '',
+        active INTEGER NOT NULL,
+        data TEXT NOT NULL
+    );
+
+    CREATE INDEX IF NOT EXISTS users_name ON users (name);
+    CREATE INDEX IF NOT EXISTS users_display_name ON users (display_name);
+    CREATE INDEX IF NOT EXISTS users_real_name ON users (real_name);
+
+    CREATE VIRTUAL TABLE IF NOT EXISTS users_fts USING fts5(
+        name,
+        display_name,
+        real_name,
+        title,
+        content = 'users',
+        content_rowid = 'rowid',
+        tokenize = 'trigram'
+    );
+
+    CREATE VIRTUAL TABLE IF NOT EXISTS users_fts_vocab USING fts5vocab(users_fts, 'col');
+
+    CREATE TABLE IF NOT EXISTS sync_times (
+        name TEXT PRIMARY KEY,
+        synced_at REAL NOT NULL
+    );
+    """
+
+    def synced_at(self) -> float | None:
+        """When the directory was last replaced, or None if it never was."""
+        row = self.conn.execute(
+            "SELECT synced_at FROM sync_times WHERE name = 'users'"
+        ).fetchone()
+        return row["synced_at"] if row else None
+
+    def is_fresh(self, ttl: float) -> bool:
+        """True if the directory was synced within the last `ttl` seconds."""
+        synced_at = self.synced_at()
+        return synced_at is not None and synced_at >= time.time() - ttl
+
+    def replace(self, members: list[dict]) -> int:
+        """
+        Replace the directory with a full users.list result and rebuild the index.
+
+        Deleted users and bots are kept (for ID lookups) but not searched.
+
+        Returns:
+            Number of members stored
+        """
+        rows = []
+        for user in members:
+            fields = user_search_fields(user)
+            active = not user.get("deleted") and not user.get("is_bot")
+            rows.append(
+                (user["id"], *(fields[f] for f in USER_SEARCH_FIELDS), active, json.dumps(user))
+            )
+
+        with self.conn:
+            self.conn.execute("DELETE FROM users")
+            self.conn.executemany(
+                "INSERT INTO users (id, name, display_name, real_name, title, active, data)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                rows,
+            )
+            self.conn.execute("INSERT INTO users_fts (users_fts) VALUES ('rebuild')")
+            self.conn.execute(
+                "INSERT OR REPLACE INTO sync_times (name, synced_at) VALUES ('users', ?)",
+                (time.time(),),
+            )
+        return len(rows)
+
+    def search(self, query: str, limit: int, candidates: int = 200) -> list[dict]:
+        """
+        Active users matching `query`, best match first.
+
+        Candidates are gathered cheapest first, stopping once there are
+        `limit` of them: prefix matches from the column indexes, then
+        substring matches from the trigram index. Only if those found next
+        to nothing (under TYPO_SEARCH_BELOW) are typos looked for, as users
+        whose names share the most of the query's trigrams; trigrams in
+        more than COMMON_TRIGRAM_ROWS names are skipped there, so in a large
+        directory a typo match is only found through the rarer trigrams.
+
+        Args:
+            query: Name, username, display name or title, typos allowed
+            limit: Max results
+            candidates: Rows read per lookup before ranking
+
+        Returns:
+            users.list member dicts
+        """
+        query = " ".join(query.lower().split())
+        if not query:
+            return []
+        per_lookup = max(candidates, limit)
+        columns = ", ".join(f"u.{field}" for field in ("id", *USER_SEARCH_FIELDS))
+        found = {}
+
+        def collect(sql, params):
+            for row in self.conn.execute(sql, params):
+                if row["id"] not in found:
+                    fields = {field: row[field] for field in USER_SEARCH_FIELDS}
+                    if score := score_user(query, fields):
+                        found[row["id"]] = score
+
+        for field in NAME_FIELDS:
+            collect(
+                f"SELECT {columns} FROM users u WHERE {field} >= ? AND {field} < ? AND active"
+                " LIMIT ?",
+                (query, query + "\uffff", per_lookup),
+            )
+
+        query_trigrams = trigrams(query)
+        if query_trigrams and len(found) < limit:
+            collect(
+                f"SELECT {columns} FROM users_fts JOIN users u ON u.rowid = users_fts.rowid"
+                " WHERE users_fts MATCH ? AND u.active LIMIT ?",
+                (fts_phrase(query), per_lookup),
+            )
+        if query_trigrams and len(found) < min(limit, TYPO_SEARCH_BELOW):
+            # Typos: each trigram's rows come straight from the index, and rows
+            # with too few of them to reach MIN_TRIGRAM_SIMILARITY are dropped
+            # before anything is read from users. Titles are left out, as
+            # common words there would make every member a candidate, and so
+            # are trigrams too common to narrow anything down; the rarest one
+            # is always kept. Each skipped trigram lowers the hits required.
+            n = len(query_trigrams)
+            shared = next(k for k in range(1, n + 1) if k / n >= MIN_TRIGRAM_SIMILARITY)
+            rows_with = {t: self._trigram_rows(t) for t in query_trigrams}
+            rarest = min(query_trigrams, key=rows_with.get)
+            kept = [t for t in query_trigrams if rows_with[t] <= COMMON_TRIGRAM_ROWS] or [rarest]
+            postings = " UNION ALL ".join(
+                ["SELECT rowid FROM users_fts WHERE users_fts MATCH ?"] * len(kept)
+            )
+            collect(
+                f"SELECT {columns} FROM ("
+                f"SELECT rowid, COUNT(*) AS hits FROM ({postings})"
+                " GROUP BY rowid HAVING hits >= ? ORDER BY hits DESC LIMIT ?"
+                ") AS matched JOIN users u ON u.rowid = matched.rowid WHERE u.active",
+                (
+                    *(f"{{{' '.join(NAME_FIELDS)}}} : {fts_phrase(t)}" for t in kept),
+                    max(1, shared - (n - len(kept))),
+                    per_lookup,
+                ),
+            )
+
+        ranked = sorted(found, key=found.get, reverse=True)[:limit]
+        users = self.get(ranked)
+        return [users[user_id] for user_id in ranked]
+
+    def _trigram_rows(self, trigram: str) -> int:
+        """Name fields containing a trigram, summed over NAME_FIELDS."""
+        row = self.conn.execute(
+            "SELECT SUM(doc) FROM users_fts_vocab WHERE term = ? AND col IN ({})".format(
+                ", ".join("?" * len(NAME_FIELDS))
+            ),
+            (trigram, *NAME_FIELDS),
+        ).fetchone()
+        return row[0] or 0
+
+    def ids_named(self, name: str) -> list[str]:
+        """IDs of users whose username, display name or real name is `name` (any case)."""
+        name = " ".join(name.lower().split())
+        rows = self.conn.execute(
+            "SELECT id FROM users WHERE name = ? OR display_name = ? OR real_name = ?",
+            (name, name, name),
+        )
+        return [row["id"] for row in rows]
+
+    def get(self, user_ids) -> dict[str, dict]:
+        """Stored users by ID, deleted users and bots included; unknown IDs are left out."""
+        user_ids = list(set(user_ids))
+        users = {}
+        for start in range(0, len(user_ids), 500):
+            chunk = user_ids[start : start + 500]
+            rows = self.conn.execute(
+                f"SELECT id, data FROM users WHERE id IN ({', '.join('?' * len(chunk))})", chunk
+            )
+            users.update((row["id"], json.loads(row["data"])) for row in rows)
+        return users
+
+
+def normalize_search_query(query: str) -> str:
+    """Cache key for a search query: case and spacing don't change Slack's results."""
+    return " ".join(query.lower().split())
+
+
+class SearchCache(SQLiteCache):
+    """
+    search.messages results by normalized query, newest match first.
+
+    Each entry keeps the matches, the reported total, how many matches were
+    requested (a later query asking for more can't be served from it) and
+    when it was last fetched or topped up.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS search_results (
+        query TEXT PRIMARY KEY,
+        max_results INTEGER NOT NULL,
+        total INTEGER NOT NULL,
+        matches TEXT NOT NULL,
+        fetched_at REAL NOT NULL
+    );
+    """
+
+    def get(self, query: str) -> dict | None:
+        """The cached entry for a query: max_results, total, matches and fetched_at."""
+        row = self.conn.execute(
+            "SELECT max_results, total, matches, fetched_at FROM search_results WHERE query = ?",
+            (normalize_search_query(query),),
+        ).fetchone()
+        if not row:
+            return None
+        return {**dict(row), "matches": json.loads(row["matches"])}
+
+    def put(self, query: str, max_results: int, total: int, matches: list[dict]) -> None:
+        """Store a query's results as fetched now."""
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO search_results"
+                " (query, max_results, total, matches, fetched_at) VALUES (?, ?, ?, ?, ?)",
+                (
+                    normalize_search_query(query),
+                    max_results,
+                    total,
+                    json.dumps(matches),
+                    time.time(),
+                ),
+            )
+
+
+def dm_key(user_ids) -> str:
+    """Key for a DM or group DM: its members' IDs, sorted."""
+    return ",".join(sorted(set(user_ids)))
+
+
+class DMCache(SQLiteCache):
+    """
+    DM and group DM channel IDs by member set, and user IDs by identifier.
+
+    A DM's channel ID never changes, so once conversations.open (or a
+    conversations.list pass) has given it, sending to the same people
+    needs neither user resolution nor another open call. Member sets
+    leave out the token owner, as conversations.open does.
+    """
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS dm_channels (
+        users TEXT PRIMARY KEY,
+        channel TEXT NOT NULL,
+        is_mpim INTEGER NOT NULL
+    );
+
+    CREATE TABLE IF NOT EXISTS dm_identifiers (
+        identifier TEXT PRIMARY KEY,
+        user_id TEXT NOT NULL
+    );
+    """
+
+    @staticmethod
+    def _normalize(identifier: str) -> str:
+        return identifier.strip().lstrip("@").lower()
+
+    def user_id(self, identifier: str) -> str | None:
+        """User ID an @name or email was resolved to before."""
+        row = self.conn.execute(
+            "SELECT user_id FROM dm_identifiers WHERE identifier = ?",
+            (self._normalize(identifier),),
+        ).fetchone()
+        return row["user_id"] if row else None
+
+    def record_user(self, identifier: str, user_id: str) -> None:
+        """Remember what an @name or email resolves to."""
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO dm_identifiers (identifier, user_id) VALUES (?, ?)",
+                (self._normalize(identifier), user_id),
+            )
+
+    def channel(self, user_ids) -> dict | None:
+        """The DM channel with exactly these users, shaped like conversations.open's."""
+        row = self.conn.execute(
+            "SELECT channel, is_mpim FROM dm_channels WHERE users = ?", (dm_key(user_ids),)
+        ).fetchone()
+        if not row:
+            return None
+        return {"id": row["channel"], "is_im": not row["is_mpim"], "is_mpim": bool(row["is_mpim"])}
+
+    def record_channel(self, user_ids, channel_id: str, is_mpim: bool) -> None:
+        """Remember the DM channel for a set of users."""
+        self.record_channels([(user_ids, channel_id, is_mpim)])
+
+    def record_channels(self, channels) -> None:
+        """Remember many (user_ids, channel_id, is_mpim) in one transaction."""
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO dm_channels (users, channel, is_mpim) VALUES (?, ?, ?)",
+                [(dm_key(users), channel_id, is_mpim) for users, channel_id, is_mpim in channels],
+            )
+
+    def forget_channel(self, channel_id: str) -> None:
+        """Drop a channel that Slack no longer accepts."""
+        with self.conn:
+            self.conn.execute("DELETE FROM dm_channels WHERE channel = ?", (channel_id,))
@@ -0,0 +1,40 @@
+"""Resumable progress for long-running bulk commands.
+
+A checkpoint is a small JSON file in the config directory, named after the
+command and a hash of its parameters, so rerunning the same command picks
+up where it left off while a different invocation starts fresh.
+"""
+
+import hashlib
+import json
+import os
+
+from slackasme.config import get_config_dir
+
+CHECKPOINT_DIRNAME = "checkpoints"
+
+
+class Checkpoint:
+    """JSON state persisted between runs of one command invocation."""
+
+    def __init__(self, name: str, params: dict):
+        key = hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()[:16]
+        self.path = get_config_dir() / CHECKPOINT_DIRNAME / f"{name}-{key}.json"
+
+    def load(self) -> dict:
+        """Return saved state, or an empty dict if there is none."""
+        if not self.path.exists():
+            return {}
+        return json.loads(self.path.read_text())
+
+    def save(self, state: dict) -> None:
+        """Atomically replace the saved state."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(state))
+        os.replace(tmp_path, self.path)
+
+    def clear(self) -> None:
+        """Remove saved state once the command has finished."""
+        if self.path.exists():
+            self.path.unlink()
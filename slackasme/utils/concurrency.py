@@ -0,0 +1,75 @@
+"""Bounded concurrency helpers for fanning out Slack API calls.
+
+WebClient is synchronous and every call is an independent HTTP request, so a
+small thread pool is enough to overlap network round-trips.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+from slackasme.validators import DEFAULT_CONCURRENCY
+
+# Slack Web API rate limit tiers (requests per minute)
+# https://api.slack.com/apis/rate-limits
+TIER_1 = 1
+TIER_2 = 20
+TIER_3 = 50
+TIER_4 = 100
+# chat.postMessage allows roughly one message per second per channel
+POST_MESSAGE_PER_CHANNEL = 60
+# ...and "several hundred" per minute across a workspace
+POST_MESSAGE_PER_WORKSPACE = 300
+
+
+def map_concurrent(func, items, *, max_workers=DEFAULT_CONCURRENCY):
+    """
+    Apply func to each item on a bounded thread pool.
+
+    Results are yielded in input order as soon as they are ready. Only a
+    small window of calls is queued ahead of the consumer, so long or lazy
+    inputs are streamed rather than submitted all at once.
+
+    Args:
+        func: Callable taking one item
+        items: Iterable of items
+        max_workers: Max calls in flight
+
+    Yields:
+        func(item) for each item, in input order
+
+    Raises:
+        The first exception raised by func, when its result is reached
+    """
+    window = max_workers * 2
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        pending = deque()
+
+        for item in items:
+            pending.append(pool.submit(func, item))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+
+
+class RateLimiter:
+    """Space calls evenly to stay under a per-minute rate. Thread-safe."""
+
+    def __init__(self, per_minute: float):
+        self.interval = 60.0 / per_minute
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+
+    def acquire(self) -> None:
+        """Block until the next call slot is available."""
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+
+        if slot > now:
+            time.sleep(slot - now)
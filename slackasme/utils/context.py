@@ -0,0 +1,104 @@
+"""Surrounding messages for search hits.
+
+Each hit needs the N messages before and after it. Hits close together in
+a channel share messages, so rather than fetching one window per hit, a
+channel's hits are walked oldest first as a few contiguous ranges: one
+request for the messages before a range starts, then forward pages (with
+only `oldest` set, conversations.history returns the messages closest to
+it) until N messages follow the last hit the range has reached. A hit
+beyond the range starts a new one, whose before-request stops at what is
+already fetched. No message is fetched twice, and channels are fetched
+concurrently.
+"""
+
+from bisect import bisect_left
+
+from slackasme.utils.concurrency import map_concurrent
+from slackasme.validators import DEFAULT_CONCURRENCY
+
+
+def fetch_channel_context(client, channel: str, hit_ts: list[str], size: int) -> dict[str, dict]:
+    """
+    Fetch the messages around hits in one channel.
+
+    Args:
+        client: Slack WebClient instance
+        channel: Channel ID
+        hit_ts: Timestamps of the hits
+        size: Messages wanted before and after each hit
+
+    Returns:
+        Messages fetched, by ts (the hits themselves may be among them)
+    """
+    hits = sorted(set(hit_ts))
+    fetched = {}
+    frontier = None  # newest ts fetched so far
+    i = 0
+
+    def history(**kwargs):
+        messages = client.conversations_history(
+            channel=channel, limit=size, inclusive=False, **kwargs
+        )["messages"]
+        fetched.update((msg["ts"], msg) for msg in messages)
+        return messages
+
+    while i < len(hits):
+        last_hit = hits[i]
+        # Slack timestamps are fixed-width, so text comparison orders them
+        history(latest=last_hit, **({"oldest": frontier} if frontier else {}))
+        frontier = last_hit
+
+        while sum(1 for ts in fetched if ts > last_hit) < size:
+            page = history(oldest=frontier)
+            if not page:
+                break
+            frontier = max(msg["ts"] for msg in page)
+            while i + 1 < len(hits) and hits[i + 1] <= frontier:
+                i += 1
+                last_hit = hits[i]
+
+        i += 1
+
+    return fetched
+
+
+def attach_context(client, matches: list[dict], size: int, *, max_workers=DEFAULT_CONCURRENCY):
+    """
+    Add "context": {"before": [...], "after": [...]} to each search match, oldest first.
+
+    A message already shown with an earlier match, or that is itself a
+    match, is left out, so overlapping windows don't repeat messages.
+
+    Args:
+        client: Slack WebClient instance
+        matches: search.messages matches (with channel.id and ts)
+        size: Messages before and after each match
+        max_workers: Channels fetched in parallel
+    """
+    hits_by_channel = {}
+    for match in matches:
+        hits_by_channel.setdefault(match["channel"]["id"], []).append(match["ts"])
+
+    def fetch(item):
+        channel, hit_ts = item
+        return fetch_channel_context(client, channel, hit_ts, size)
+
+    items = list(hits_by_channel.items())
+    results = map_concurrent(fetch, items, max_workers=max_workers)
+    fetched_by_channel = {channel: fetched for (channel, _), fetched in zip(items, results)}
+
+    shown = {channel: set(hit_ts) for channel, hit_ts in hits_by_channel.items()}
+    for match in matches:
+        channel = match["channel"]["id"]
+        fetched = fetched_by_channel[channel]
+        timeline = sorted(set(fetched) | shown[channel])
+        position = bisect_left(timeline, match["ts"])
+
+        context = {}
+        for key, window in (
+            ("before", timeline[max(0, position - size) : position]),
+            ("after", timeline[position + 1 : position + 1 + size]),
+        ):
+            context[key] = [fetched[ts] for ts in window if ts not in shown[channel]]
+            shown[channel].update(window)
+        match["context"] = context
@@ -0,0 +1,126 @@
+"""Socket Mode backend for following channels by push instead of polling.
+
+Requires an app-level token (xapp-) for an app with Socket Mode enabled
+and message events (message.channels, message.groups, ...) subscribed.
+Message events are delivered over a WebSocket; the SDK client reconnects
+automatically, and every new connection ("hello") triggers a backfill via
+conversations.history from the last ts seen, so nothing is lost in the gap.
+
+Events are handled one at a time, in the order they arrive, so a hello is
+always backfilled before the new connection's events. Slack may still
+deliver events out of ts order (e.g. retries), so duplicates are dropped
+by remembering the timestamps already emitted rather than by comparing
+with the newest one.
+"""
+
+import threading
+from collections import deque
+
+from slack_sdk.socket_mode import SocketModeClient
+from slack_sdk.socket_mode.response import SocketModeResponse
+
+from slackasme.logging import logger
+from slackasme.utils.tail import ChannelTail
+
+# Edits and deletions are not new messages
+IGNORED_SUBTYPES = {"message_changed", "message_deleted"}
+# Emitted timestamps remembered per channel to drop duplicate deliveries
+SEEN_PER_CHANNEL = 1000
+
+
+class SocketModeTail:
+    """Follows channels via Socket Mode message events with gap backfill."""
+
+    def __init__(self, app_token: str, web_client, channels: list[str], emit):
+        """
+        Args:
+            app_token: App-level token (xapp-...)
+            web_client: WebClient used for backfill (user token)
+            channels: Channel IDs to follow (events only carry IDs)
+            emit: Callable(channel, message), called once per message, in arrival order
+        """
+        self.tails = {channel: ChannelTail(web_client, channel) for channel in channels}
+        self.emit = emit
+        self.lock = threading.Lock()
+        # Per channel: where tailing started, and the timestamps emitted since
+        self.start_ts = {}
+        self.seen = {channel: (set(), deque()) for channel in channels}
+
+        # One listener thread: events (and hello backfills) are handled in arrival order
+        self.socket_client = SocketModeClient(
+            app_token=app_token, web_client=web_client, concurrency=1
+        )
+        self.socket_client.message_listeners.append(self._on_message)
+        self.socket_client.socket_mode_request_listeners.append(self._on_request)
+
+    def start(self, backlog: int = 0) -> None:
+        """Emit each channel's backlog, then connect."""
+        with self.lock:
+            for channel, tail in self.tails.items():
+                backlog_messages = tail.start(backlog)
+                self.start_ts[channel] = tail.last_ts
+                for msg in backlog_messages:
+                    self._emit_new(channel, msg)
+
+        self.socket_client.connect()
+
+    def close(self) -> None:
+        """Disconnect and stop background threads."""
+        self.socket_client.close()
+
+    def backfill(self) -> None:
+        """Fetch anything newer than the last seen ts in every channel."""
+        with self.lock:
+            for channel, tail in self.tails.items():
+                missed = tail.poll()
+                if missed:
+                    logger.info(f"Backfilled {len(missed)} messages in {channel}")
+                for msg in missed:
+                    self._emit_new(channel, msg)
+
+    def _on_message(self, client, message: dict, raw_message: str) -> None:
+        # Slack sends "hello" on every new connection, including reconnects
+        if message.get("type") == "hello":
+            self.backfill()
+
+    def _on_request(self, client, request) -> None:
+        if request.type != "events_api":
+            return
+
+        client.send_socket_mode_response(SocketModeResponse(envelope_id=request.envelope_id))
+
+        event = request.payload.get("event", {})
+        if event.get("type") != "message" or event.get("subtype") in IGNORED_SUBTYPES:
+            return
+        # Like conversations.history, only top-level messages (and broadcasts)
+        if event.get("thread_ts", event.get("ts")) != event.get("ts"):
+            if event.get("subtype") != "thread_broadcast":
+                return
+
+        self._deliver(event.get("channel"), event)
+
+    def _deliver(self, channel: str, msg: dict) -> None:
+        with self.lock:
+            tail = self.tails.get(channel)
+            if tail is None:
+                return
+            # Existing before tailing started (and not part of the backlog)
+            start_ts = self.start_ts.get(channel)
+            if start_ts and msg["ts"] <= start_ts:
+                return
+
+            if self._emit_new(channel, msg) and msg["ts"] > (tail.last_ts or ""):
+                tail.last_ts = msg["ts"]
+
+    def _emit_new(self, channel: str, msg: dict) -> bool:
+        """Emit a message unless it was emitted before (e.g. live and by a backfill)."""
+        seen, order = self.seen[channel]
+        if msg["ts"] in seen:
+            return False
+
+        seen.add(msg["ts"])
+        order.append(msg["ts"])
+        if len(order) > SEEN_PER_CHANNEL:
+            seen.discard(order.popleft())
+        self.emit(channel, msg)
+        return True
@@ -0,0 +1,64 @@
+"""Channel history merged across several channels.
+
+Each channel's history is paged newest first and the channels are k-way
+merged by ts with a heap, so output is globally ordered while only about
+one page per channel is held in memory. Every channel's first page is
+requested up front; a further page only once the merge reaches the last
+message of the current one, so a channel that contributes little to the
+output costs a single request.
+"""
+
+import heapq
+from concurrent.futures import ThreadPoolExecutor
+
+from slackasme.utils.resolution import iter_pages
+from slackasme.validators import DEFAULT_CONCURRENCY
+
+
+def iter_merged_history(
+    client,
+    channels,
+    *,
+    oldest=None,
+    latest=None,
+    page_size=200,
+    max_workers=DEFAULT_CONCURRENCY,
+):
+    """
+    Yield (channel, message) from several channels, newest first.
+
+    Args:
+        client: Slack WebClient instance
+        channels: Channels to read
+        oldest: Only messages after this Slack timestamp
+        latest: Only messages before this Slack timestamp
+        page_size: Messages requested per page
+        max_workers: Page fetches in flight across all channels
+
+    Yields:
+        (channel, message) tuples in descending ts order
+    """
+    bounds = {key: value for key, value in (("oldest", oldest), ("latest", latest)) if value}
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+
+        def channel_stream(channel, pages, future):
+            while (page := future.result()) is not None:
+                messages = page["messages"]
+                if not messages:
+                    future = pool.submit(next, pages, None)
+                for i, msg in enumerate(messages):
+                    if i == len(messages) - 1:
+                        # The merge has reached this page's end: fetch the next one
+                        future = pool.submit(next, pages, None)
+                    yield channel, msg
+
+        streams = []
+        for channel in channels:
+            pages = iter_pages(
+                client.conversations_history, page_size=page_size, channel=channel, **bounds
+            )
+            # Submitted now, not on first next(), so every channel's first page is fetched together
+            streams.append(channel_stream(channel, pages, pool.submit(next, pages, None)))
+
+        yield from heapq.merge(*streams, key=lambda item: float(item[1]["ts"]), reverse=True)
@@ -12,6 +12,8 @@ from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
 
 from slackasme.logging import logger
+from slackasme.utils.concurrency import TIER_3, TIER_4, RateLimiter, map_concurrent
+from slackasme.validators import DEFAULT_CONCURRENCY
 
 # Slack ID patterns (typically 9-11 chars, but can vary)
 USER_ID_PATTERN = re.compile(r"^U[A-Z0-9]{8,12}$")
@@ -57,6 +59,76 @@ def paginate_until(client_method, result_key, *, limit=None, find_func=None, **k
     return None if find_func else results
 
 
+def iter_pages(client_method, *, page_size=200, **kwargs):
+    """
+    Yield successive cursor-paginated responses from an API method.
+
+    Unlike paginate_until, nothing is accumulated, so callers can stream
+    long histories while holding a single page in memory.
+
+    Args:
+        client_method: Slack API method to call (e.g., client.conversations_history)
+        page_size: Items requested per page
+        **kwargs: Additional arguments to pass to the API method
+
+    Yields:
+        One API response per page
+    """
+    cursor = None
+
+    while True:
+        response = client_method(cursor=cursor, limit=page_size, **kwargs)
+        yield response
+
+        cursor = response.get("response_metadata", {}).get("next_cursor")
+        if not cursor:
+            break
+
+
+def iter_numbered_pages(
+    client_method,
+    *,
+    page_size=100,
+    max_pages=None,
+    max_workers=DEFAULT_CONCURRENCY,
+    paging_key=None,
+    **kwargs,
+):
+    """
+    Yield responses from an API method with numbered pages, fetching in parallel.
+
+    For older methods such as files.list and search.messages that page with
+    page/count and report the page total in a "paging" object. Once page 1
+    has given the total, the remaining pages are fetched concurrently and
+    yielded in page order.
+
+    Args:
+        client_method: Slack API method to call (e.g., client.files_list)
+        page_size: Items requested per page (count)
+        max_pages: Stop after this many pages
+        max_workers: Pages fetched in parallel
+        paging_key: Key holding "paging" when it isn't top level
+            (e.g. "messages" for search.messages)
+        **kwargs: Additional arguments to pass to the API method
+
+    Yields:
+        One API response per page
+    """
+
+    def fetch(page):
+        return client_method(page=page, count=page_size, **kwargs)
+
+    first = fetch(1)
+    yield first
+
+    container = first.get(paging_key, {}) if paging_key else first
+    pages = container.get("paging", {}).get("pages", 1)
+    if max_pages:
+        pages = min(pages, max_pages)
+
+    yield from map_concurrent(fetch, range(2, pages + 1), max_workers=max_workers)
+
+
 def resolve_user(client: WebClient, identifier: str) -> dict | None:
     """
     Resolve a user identifier to a user object.
@@ -133,3 +205,210 @@ def resolve_users(client: WebClient, identifiers: list[str]) -> tuple[list[dict]
             not_found.append(identifier)
 
     return resolved, not_found
+
+
+def resolve_user_ids(
+    client: WebClient, identifiers: list[str], *, max_workers=DEFAULT_CONCURRENCY
+) -> tuple[dict[str, str], list[str]]:
+    """
+    Resolve many user identifiers to IDs with as few API calls as possible.
+
+    User IDs are taken as given (a bad one fails wherever it is used),
+    emails are looked up concurrently at the users.lookupByEmail rate, and
+    all usernames are matched in one users.list pass that stops once every
+    name is found.
+
+    Args:
+        client: Slack WebClient instance
+        identifiers: User IDs, emails, or usernames
+
+    Returns:
+        Tuple of ({identifier: user_id}, not_found_identifiers)
+    """
+    resolved = {}
+    emails = []
+    names = {}
+
+    for identifier in identifiers:
+        bare = identifier.strip().lstrip("@")
+        if USER_ID_PATTERN.match(bare):
+            resolved[identifier] = bare
+        elif EMAIL_PATTERN.match(bare):
+            emails.append(identifier)
+        else:
+            names.setdefault(bare.lower(), []).append(identifier)
+
+    limiter = RateLimiter(TIER_3)
+
+    def lookup(email):
+        limiter.acquire()
+        try:
+            return client.users_lookupByEmail(email=email.strip())["user"]["id"]
+        except SlackApiError as e:
+            if e.response.get("error") == "users_not_found":
+                return None
+            raise
+
+    for email, user_id in zip(emails, map_concurrent(lookup, emails, max_workers=max_workers)):
+        if user_id:
+            resolved[email] = user_id
+
+    if names:
+        logger.debug(f"Resolving {len(names)} usernames in one users.list pass")
+        for page in iter_pages(client.users_list):
+            for user in page["members"]:
+                for identifier in names.pop(user.get("name", "").lower(), []):
+                    resolved[identifier] = user["id"]
+            if not names:
+                break
+
+    return resolved, [identifier for identifier in identifiers if identifier not in resolved]
+
+
+def open_dm(client: WebClient, identifiers: list[str], cache) -> tuple[dict | None, list[str]]:
+    """
+    Get the DM (one user) or group DM (several users) channel, opening it if needed.
+
+    User IDs are used as given; @names and emails are resolved once and
+    remembered in the DM cache, as is the channel, so repeat calls make
+    no API requests.
+
+    Args:
+        client: Slack WebClient instance
+        identifiers: User IDs, emails, or usernames
+        cache: DMCache instance
+
+    Returns:
+        Tuple of (channel dict with id/is_im/is_mpim or None, not_found_identifiers)
+    """
+    user_ids = []
+    not_found = []
+
+    for identifier in identifiers:
+        bare = identifier.strip().lstrip("@")
+        if USER_ID_PATTERN.match(bare):
+            user_ids.append(bare)
+            continue
+
+        user_id = cache.user_id(identifier)
+        if not user_id:
+            user = resolve_user(client, identifier)
+            if not user:
+                not_found.append(identifier)
+                continue
+            user_id = user["id"]
+            cache.record_user(identifier, user_id)
+        user_ids.append(user_id)
+
+    if not_found:
+        return None, not_found
+
+    channel = cache.channel(user_ids)
+    if channel:
+        logger.debug(f"Using cached DM channel {channel['id']}")
+        return channel, []
+
+    channel = client.conversations_open(users=",".join(user_ids))["channel"]
+    cache.record_channel(user_ids, channel["id"], bool(channel.get("is_mpim")))
+    return channel, []
+
+
+def list_dm_conversations(client: WebClient, *, max_workers=DEFAULT_CONCURRENCY):
+    """
+    All open DMs and group DMs with their other members.
+
+    DMs carry their peer's ID; group DMs don't list members in
+    conversations.list, so those are fetched concurrently. The token
+    owner is left out of member lists, as conversations.open does.
+
+    Returns:
+        List of (conversation, member_ids) from conversations.list types=im,mpim
+    """
+    self_id = client.auth_test()["user_id"]
+    conversations = []
+    for page in iter_pages(client.conversations_list, types="im,mpim", exclude_archived=True):
+        conversations.extend(page["channels"])
+
+    mpims = [c for c in conversations if c.get("is_mpim")]
+
+    def members(conversation):
+        return paginate_until(client.conversations_members, "members", channel=conversation["id"])
+
+    mpim_members = {
+        conversation["id"]: [m for m in member_ids if m != self_id]
+        for conversation, member_ids in zip(
+            mpims, map_concurrent(members, mpims, max_workers=max_workers)
+        )
+    }
+    return [
+        (c, mpim_members[c["id"]] if c.get("is_mpim") else [c["user"]]) for c in conversations
+    ]
+
+
+def record_dm_conversations(cache, conversations) -> None:
+    """Record (conversation, member_ids) pairs in the DM cache."""
+    cache.record_channels(
+        (member_ids, conversation["id"], bool(conversation.get("is_mpim")))
+        for conversation, member_ids in conversations
+    )
+
+
+def sync_dm_channels(client: WebClient, cache, *, max_workers=DEFAULT_CONCURRENCY) -> int:
+    """
+    Record every open DM and group DM in the DM cache from conversations.list.
+
+    Returns:
+        Number of channels recorded
+    """
+    conversations = list_dm_conversations(client, max_workers=max_workers)
+    record_dm_conversations(cache, conversations)
+    return len(conversations)
+
+
+def sync_user_directory(client: WebClient, directory) -> int:
+    """Replace a UserDirectory with every member from a full users.list pass."""
+    count = directory.replace(paginate_until(client.users_list, "members"))
+    logger.info(f"Synced user directory: {count} members")
+    return count
+
+
+def hydrate_users(
+    client: WebClient, directory, user_ids, *, ttl: float, max_workers=DEFAULT_CONCURRENCY
+) -> dict[str, dict]:
+    """
+    Look up many users by ID in one batched pass.
+
+    Users come from the local UserDirectory. If some are missing and the
+    directory is older than `ttl`, it is re-synced once with users.list;
+    any still missing (e.g. people from other workspaces) are fetched
+    with users.info, concurrently.
+
+    Returns:
+        {user_id: user} for the IDs that exist
+    """
+    user_ids = set(user_ids)
+    users = directory.get(user_ids)
+
+    if len(users) < len(user_ids) and not directory.is_fresh(ttl):
+        sync_user_directory(client, directory)
+        users = directory.get(user_ids)
+
+    missing = [user_id for user_id in user_ids if user_id not in users]
+    if missing:
+        logger.debug(f"Fetching {len(missing)} users not in the directory")
+        limiter = RateLimiter(TIER_4)
+
+        def info(user_id):
+            limiter.acquire()
+            try:
+                return client.users_info(user=user_id)["user"]
+            except SlackApiError as e:
+                if e.response.get("error") == "user_not_found":
+                    return None
+                raise
+
+        for user_id, user in zip(missing, map_concurrent(info, missing, max_workers=max_workers)):
+            if user:
+                users[user_id] = user
+
+    return users
@@ -0,0 +1,47 @@
+"""Streaming aggregates over channel history.
+
+Aggregators take one page of messages at a time and keep only counters,
+so memory grows with the number of distinct keys, not with history size.
+"""
+
+from collections import Counter
+
+
+def base_emoji(name: str) -> str:
+    """Strip a skin-tone modifier (thumbsup::skin-tone-2 -> thumbsup)."""
+    return name.split("::", 1)[0]
+
+
+class ReactionStats:
+    """Reaction counts per emoji and per reacting user."""
+
+    def __init__(self):
+        self.emoji = Counter()
+        self.users = Counter()
+        self.messages = 0
+        self.reacted_messages = 0
+        self.total = 0
+
+    def add_messages(self, messages: list) -> None:
+        """Fold one page of messages into the counts."""
+        for msg in messages:
+            self.messages += 1
+            reactions = msg.get("reactions", [])
+            if reactions:
+                self.reacted_messages += 1
+
+            for reaction in reactions:
+                # "count" is exact; "users" may be truncated on very popular messages
+                self.emoji[base_emoji(reaction["name"])] += reaction.get("count", 0)
+                self.total += reaction.get("count", 0)
+                self.users.update(reaction.get("users", []))
+
+    def to_dict(self, top: int) -> dict:
+        """Summary with the `top` most used emoji and most active reacting users."""
+        return {
+            "messages": self.messages,
+            "reacted_messages": self.reacted_messages,
+            "reactions": self.total,
+            "emoji": [{"name": name, "count": n} for name, n in self.emoji.most_common(top)],
+            "users": [{"user": user, "count": n} for user, n in self.users.most_common(top)],
+        }
@@ -0,0 +1,167 @@
+"""Polling helpers for following channels in near real time.
+
+Each poll asks conversations.history only for messages newer than the
+last-seen ts, and the poll interval adapts to channel activity: it drops
+to the minimum as soon as something arrives and backs off while quiet.
+
+When following many channels, TailScheduler shares one request budget
+between them, giving busier channels a proportionally larger share.
+"""
+
+import time
+
+from slackasme.utils.concurrency import RateLimiter
+from slackasme.utils.resolution import iter_pages
+
+# conversations.history is Tier 3 (~50/min); stay comfortably below that
+MIN_POLL_INTERVAL = 2.0
+MAX_POLL_INTERVAL = 60.0
+POLL_BACKOFF = 1.5
+# New messages per request; more than this in one interval just paginates
+TAIL_PAGE_SIZE = 20
+# Polls per minute shared by every followed channel
+DEFAULT_POLL_BUDGET = 40
+# Weight of the latest poll in a channel's activity average
+ACTIVITY_SMOOTHING = 0.3
+# Baseline activity so quiet channels keep a share of the budget
+ACTIVITY_FLOOR = 0.1
+
+
+class AdaptivePollInterval:
+    """Poll interval that tightens when a channel is busy and backs off when quiet."""
+
+    def __init__(
+        self,
+        minimum: float = MIN_POLL_INTERVAL,
+        maximum: float = MAX_POLL_INTERVAL,
+        backoff: float = POLL_BACKOFF,
+    ):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.backoff = backoff
+        self.current = minimum
+
+    def update(self, new_messages: int) -> float:
+        """Adjust the interval after a poll and return the new value."""
+        if new_messages:
+            self.current = self.minimum
+        else:
+            self.current = min(self.maximum, self.current * self.backoff)
+        return self.current
+
+
+class ChannelTail:
+    """Tracks the last-seen ts of a channel and fetches only newer messages."""
+
+    def __init__(self, client, channel: str, *, page_size: int = TAIL_PAGE_SIZE):
+        self.client = client
+        self.channel = channel
+        self.page_size = page_size
+        self.last_ts = None
+
+    def start(self, backlog: int = 0) -> list:
+        """
+        Set the starting point and return the last `backlog` messages, oldest first.
+
+        With no backlog the tail starts from the newest existing message
+        (or now, for an empty channel), so nothing old is replayed.
+        """
+        response = self.client.conversations_history(channel=self.channel, limit=max(backlog, 1))
+        messages = response["messages"]
+
+        self.last_ts = messages[0]["ts"] if messages else f"{time.time():.6f}"
+        return list(reversed(messages[:backlog]))
+
+    def poll(self) -> list:
+        """Fetch messages newer than the last-seen ts, oldest first."""
+        new = []
+        for response in iter_pages(
+            self.client.conversations_history,
+            page_size=self.page_size,
+            channel=self.channel,
+            oldest=self.last_ts,
+        ):
+            new.extend(response["messages"])
+
+        new.sort(key=lambda msg: msg["ts"])
+        if new:
+            self.last_ts = new[-1]["ts"]
+        return new
+
+
+class TailScheduler:
+    """
+    Polls many channels under one shared conversations.history budget.
+
+    Each channel's share of the budget is proportional to its recent
+    activity (a smoothed average of new messages per poll). A channel is
+    polled no faster than its share allows, nor faster than its own
+    adaptive interval, and never slower than the maximum interval.
+    """
+
+    def __init__(
+        self,
+        tails: list[ChannelTail],
+        *,
+        budget: float = DEFAULT_POLL_BUDGET,
+        min_interval: float = MIN_POLL_INTERVAL,
+        max_interval: float = MAX_POLL_INTERVAL,
+    ):
+        self.tails = tails
+        self.budget = budget
+        self.max_interval = max_interval
+        self.limiter = RateLimiter(budget)
+        self.intervals = {
+            tail.channel: AdaptivePollInterval(min_interval, max_interval) for tail in tails
+        }
+        self.activity = {tail.channel: 0.0 for tail in tails}
+        self.next_due = {}
+
+    def start(self, backlog: int = 0) -> list[tuple[str, dict]]:
+        """Start every tail and return their backlogs merged oldest first."""
+        merged = []
+        for tail in self.tails:
+            self.limiter.acquire()
+            merged.extend((tail.channel, msg) for msg in tail.start(backlog))
+            self._schedule(tail.channel)
+
+        merged.sort(key=lambda item: item[1]["ts"])
+        return merged
+
+    def interval_for(self, channel: str) -> float:
+        """Seconds until a channel should be polled again."""
+        weights = {name: activity + ACTIVITY_FLOOR for name, activity in self.activity.items()}
+        share = weights[channel] / sum(weights.values())
+        budget_interval = 60.0 / (self.budget * share)
+
+        return min(self.max_interval, max(budget_interval, self.intervals[channel].current))
+
+    def time_until_due(self) -> float:
+        """Seconds until the next channel is due."""
+        return max(0.0, min(self.next_due.values()) - time.monotonic())
+
+    def poll_due(self) -> list[tuple[str, dict]]:
+        """Poll every channel that is due and return new messages oldest first."""
+        now = time.monotonic()
+        merged = []
+
+        for tail in self.tails:
+            if self.next_due[tail.channel] > now:
+                continue
+
+            self.limiter.acquire()
+            new = tail.poll()
+            merged.extend((tail.channel, msg) for msg in new)
+
+            self.activity[tail.channel] = (
+                ACTIVITY_SMOOTHING * len(new)
+                + (1 - ACTIVITY_SMOOTHING) * self.activity[tail.channel]
+            )
+            self.intervals[tail.channel].update(len(new))
+            self._schedule(tail.channel)
+
+        merged.sort(key=lambda item: item[1]["ts"])
+        return merged
+
+    def _schedule(self, channel: str) -> None:
+        self.next_due[channel] = time.monotonic() + self.interval_for(channel)
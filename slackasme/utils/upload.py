@@ -0,0 +1,119 @@
+"""Multi-file uploads through Slack's external upload flow.
+
+files_upload_v2 runs the three steps (files.getUploadURLExternal, a POST
+of the bytes to the returned URL, files.completeUploadExternal) one file
+at a time. Here the first two steps run per file on a bounded pool, and a
+single completeUploadExternal call then shares every file in one message.
+
+File bytes are streamed from disk in fixed-size chunks rather than read
+whole, so memory stays flat however large (or however many) the files are.
+"""
+
+import os
+import time
+from urllib.error import HTTPError, URLError
+from urllib.request import Request, urlopen
+
+from slack_sdk.errors import SlackRequestError
+
+from slackasme.utils.concurrency import map_concurrent
+from slackasme.validators import DEFAULT_CONCURRENCY
+
+# Bytes read from disk and handed to the socket at a time
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+
+
+def iter_chunks(f, chunk_size: int = UPLOAD_CHUNK_SIZE, progress=None):
+    """Yield a file's contents in chunks, reporting each chunk's size to `progress`."""
+    while chunk := f.read(chunk_size):
+        yield chunk
+        if progress:
+            progress(len(chunk))
+
+
+def post_file(client, url: str, path: str, progress=None) -> None:
+    """
+    Stream a file to an upload URL from files.getUploadURLExternal.
+
+    Args:
+        client: WebClient (for its timeout and SSL context)
+        url: Upload URL
+        path: File to send
+        progress: Optional callable(n_bytes), called as chunks are sent
+    """
+    name = os.path.basename(path)
+
+    with open(path, "rb") as f:
+        # An explicit Content-Length keeps urllib from buffering or chunk-encoding
+        request = Request(
+            url,
+            data=iter_chunks(f, UPLOAD_CHUNK_SIZE, progress),
+            headers={"Content-Length": str(os.fstat(f.fileno()).st_size)},
+            method="POST",
+        )
+        try:
+            with urlopen(request, timeout=client.timeout, context=client.ssl) as response:
+                response.read()
+        except HTTPError as e:
+            raise SlackRequestError(f"Failed to upload {name} (status: {e.code})") from None
+        except URLError as e:
+            raise SlackRequestError(f"Failed to upload {name}: {e.reason}") from None
+
+
+def upload_one(client, path: str, progress=None) -> dict:
+    """
+    Reserve an upload URL for a file and send its bytes (steps 1 and 2).
+
+    Returns:
+        {"name", "path", "id", "size", "seconds"}, timing only the transfer
+    """
+    name = os.path.basename(path)
+    size = os.path.getsize(path)
+    reserved = client.files_getUploadURLExternal(filename=name, length=size)
+
+    started = time.monotonic()
+    post_file(client, reserved["upload_url"], path, progress=progress)
+    seconds = time.monotonic() - started
+
+    return {"name": name, "path": path, "id": reserved["file_id"], "size": size, "seconds": seconds}
+
+
+def upload_files(
+    client,
+    paths: list[str],
+    *,
+    channel: str,
+    initial_comment: str | None = None,
+    max_workers: int = DEFAULT_CONCURRENCY,
+    progress=None,
+):
+    """
+    Upload files in parallel and share them together in one message.
+
+    Args:
+        client: WebClient
+        paths: Files to upload
+        channel: Channel to share the files in
+        initial_comment: Message text posted with the files
+        max_workers: Uploads in flight
+        progress: Optional callable(n_bytes), called from worker threads
+
+    Returns:
+        (files.completeUploadExternal response, upload_one results in input order)
+
+    Raises:
+        SlackApiError: If an API call fails
+        SlackRequestError: If sending a file's bytes fails
+    """
+    uploaded = list(
+        map_concurrent(
+            lambda path: upload_one(client, path, progress), paths, max_workers=max_workers
+        )
+    )
+
+    response = client.files_completeUploadExternal(
+        files=[{"id": upload["id"], "title": upload["name"]} for upload in uploaded],
+        channel_id=channel,
+        initial_comment=initial_comment,
+    )
+    return response, uploaded
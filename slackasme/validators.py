@@ -2,6 +2,7 @@
 
 import os
 import re
+from datetime import datetime
 
 import click
 
@@ -11,6 +12,10 @@ MAX_SEARCH_QUERY_LENGTH = 1000
 MAX_LIMIT = 1000
 DEFAULT_LIMIT = 100
 MAX_FILE_SIZE = 300 * 1024 * 1024  # 300MB
+DEFAULT_CONCURRENCY = 8
+MAX_CONCURRENCY = 32
+# files.list "types" filter values
+FILE_TYPES = ("spaces", "snippets", "images", "gdocs", "zips", "pdfs")
 
 
 def validate_channel(ctx, param, value):
@@ -28,6 +33,18 @@ def validate_channel(ctx, param, value):
     return value
 
 
+def validate_optional_channel(ctx, param, value):
+    """Validate channel format for an optional --channel option."""
+    if value is None:
+        return value
+    return validate_channel(ctx, param, value)
+
+
+def validate_channels(ctx, param, value):
+    """Validate a list of channels (for nargs=-1 arguments)."""
+    return tuple(validate_channel(ctx, param, channel) for channel in value)
+
+
 def validate_text(ctx, param, value):
     """Validate message text."""
     if not value:
@@ -53,6 +70,44 @@ def validate_timestamp(ctx, param, value):
     return value
 
 
+def validate_date(ctx, param, value):
+    """Validate a date/time and convert it to a Slack timestamp.
+
+    Accepts YYYY-MM-DD, YYYY-MM-DDTHH:MM (local time) or a Unix/Slack timestamp.
+    """
+    if not value:
+        return value
+
+    if re.match(r"^\d+(\.\d+)?$", value):
+        seconds, _, micros = value.partition(".")
+        return f"{seconds}.{micros[:6].ljust(6, '0')}"
+
+    for fmt in ("%Y-%m-%d", "%Y-%m-%dT%H:%M", "%Y-%m-%d %H:%M"):
+        try:
+            return f"{datetime.strptime(value, fmt).timestamp():.6f}"
+        except ValueError:
+            continue
+
+    raise click.BadParameter(
+        f"Invalid date: {value} (expected: YYYY-MM-DD, YYYY-MM-DDTHH:MM or a timestamp)"
+    )
+
+
+DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+
+def validate_duration(ctx, param, value):
+    """Validate a duration like 90s, 30m, 12h, 7d or 2w and convert it to seconds."""
+    if value is None:
+        return value
+
+    match = re.match(r"^(\d+)([smhdw])$", value)
+    if not match:
+        raise click.BadParameter(f"Invalid duration: {value} (expected e.g. 30m, 12h, 7d, 2w)")
+
+    return int(match.group(1)) * DURATION_UNITS[match.group(2)]
+
+
 def validate_emoji(ctx, param, value):
     """Validate emoji name."""
     if not value:
@@ -88,6 +143,21 @@ def validate_file_path(ctx, param, value):
     return abs_path
 
 
+def validate_file_types(ctx, param, value):
+    """Validate a comma-separated files.list types filter (e.g. images,pdfs)."""
+    if not value:
+        return value
+
+    types = [t.strip() for t in value.split(",")]
+    unknown = [t for t in types if t not in FILE_TYPES]
+    if unknown:
+        raise click.BadParameter(
+            f"Unknown file type: {', '.join(unknown)} (choose from: {', '.join(FILE_TYPES)})"
+        )
+
+    return ",".join(types)
+
+
 def validate_limit(ctx, param, value):
     """Validate limit parameter."""
     if value < 1:
@@ -99,6 +169,17 @@ def validate_limit(ctx, param, value):
     return value
 
 
+def validate_concurrency(ctx, param, value):
+    """Validate concurrency (parallel requests) parameter."""
+    if value < 1:
+        raise click.BadParameter("Concurrency must be at least 1")
+
+    if value > MAX_CONCURRENCY:
+        raise click.BadParameter(f"Concurrency too high (max {MAX_CONCURRENCY})")
+
+    return value
+
+
 def validate_search_query(ctx, param, value):
     """Validate search query."""
     if not value:
@@ -1,5 +1,8 @@
 """Pytest fixtures for slackasme tests."""
 
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -34,6 +37,97 @@ def mock_token(tmp_path):
             yield token_file
 
 
+@pytest.fixture(autouse=True)
+def config_dir(tmp_path):
+    """Point the config directory (archive, caches) at a temporary path."""
+    config_dir = tmp_path / "config"
+    with patch("slackasme.config.CONFIG_DIR", config_dir):
+        yield config_dir
+
+
+@pytest.fixture
+def upload_server():
+    """
+    Local stand-in for Slack's upload URLs.
+
+    Yields (base_url, received): POST bodies are stored in `received` by
+    request path. Paths starting with /fail get a 500 response.
+    """
+    received = {}
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            length = int(self.headers["Content-Length"])
+            received[self.path] = self.rfile.read(length)
+            status = 500 if self.path.startswith("/fail") else 200
+            self.send_response(status)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"OK")
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}", received
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def download_server():
+    """
+    Local stand-in for Slack's url_private_download with Range support.
+
+    Yields (base_url, files, requests): put bytes in `files` by request path;
+    each request's headers are appended to `requests`. Requests without a
+    Bearer token get a 401, paths starting with /norange ignore Range, and
+    paths starting with /stall send half the body and then stall.
+    """
+    files = {}
+    requests = []
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            requests.append(dict(self.headers))
+            body = files.get(self.path)
+            if not self.headers.get("Authorization", "").startswith("Bearer "):
+                return self._respond(401, b"")
+            if body is None:
+                return self._respond(404, b"")
+
+            range_header = self.headers.get("Range")
+            if range_header and not self.path.startswith("/norange"):
+                start = int(range_header.removeprefix("bytes=").rstrip("-"))
+                if start >= len(body):
+                    return self._respond(416, b"")
+                return self._respond(206, body[start:])
+            self._respond(200, body)
+
+        def _respond(self, status, body):
+            self.send_response(status)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            if self.path.startswith("/stall"):
+                self.wfile.write(body[: len(body) // 2])
+                self.wfile.flush()
+                time.sleep(1)
+                return
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_port}", files, requests
+    server.shutdown()
+    server.server_close()
+
+
 @pytest.fixture(autouse=True)
 def reset_client_fixture():
     """Reset the global client before and after each test."""
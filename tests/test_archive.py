@@ -0,0 +1,260 @@
+"""Tests for the local message archive."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from slackasme.utils.archive import (
+    Archive,
+    build_fts_query,
+    open_archive,
+    parse_search_query,
+    sync_channel,
+)
+from slackasme.utils.cache import UserDirectory
+
+
+def make_response(data):
+    response = MagicMock()
+    response.data = data
+    response.__getitem__ = lambda self, key: data[key]
+    response.get = lambda key, default=None: data.get(key, default)
+    return response
+
+
+def make_client():
+    client = MagicMock()
+    client.conversations_info.return_value = make_response(
+        {"channel": {"id": "C12345678", "name": "general"}}
+    )
+    return client
+
+
+class TestArchive:
+    def test_store_and_read_newest_first(self, tmp_path):
+        with Archive(tmp_path / "archive.db") as archive:
+            archive.store_messages(
+                "general",
+                [
+                    {"ts": "1700000001.000100", "user": "U1", "text": "first"},
+                    {"ts": "1700000003.000100", "user": "U2", "text": "third"},
+                    {"ts": "1700000002.000100", "user": "U1", "text": "second"},
+                ],
+            )
+
+            messages = archive.recent_messages("general", 2)
+
+        assert [m["text"] for m in messages] == ["third", "second"]
+
+    def test_upsert_replaces_edited_message(self, tmp_path):
+        with Archive(tmp_path / "archive.db") as archive:
+            archive.store_messages("general", [{"ts": "1700000001.000100", "text": "typo"}])
+            archive.store_messages("general", [{"ts": "1700000001.000100", "text": "fixed"}])
+
+            messages = archive.recent_messages("general", 10)
+
+        assert [m["text"] for m in messages] == ["fixed"]
+
+    def test_channel_names_normalized(self, tmp_path):
+        with Archive(tmp_path / "archive.db") as archive:
+            archive.store_messages("#general", [{"ts": "1700000001.000100", "text": "hi"}])
+
+            assert len(archive.recent_messages("general", 10)) == 1
+
+    def test_high_water_mark_never_moves_backwards(self, tmp_path):
+        with Archive(tmp_path / "archive.db") as archive:
+            assert archive.high_water_mark("general") is None
+
+            archive.store_messages("general", [], high_water_ts="1700000005.000000")
+            archive.store_messages("general", [], high_water_ts="1700000001.000000")
+
+            assert archive.high_water_mark("general") == "1700000005.000000"
+
+    def test_open_archive_uses_config_dir(self, config_dir):
+        with open_archive() as archive:
+            assert archive.path == config_dir / "archive.db"
+
+
+class TestSyncChannel:
+    def test_first_sync_fetches_all_pages(self, tmp_path):
+        page1 = make_response(
+            {
+                "messages": [{"ts": "1700000003.000000", "text": "c"}],
+                "response_metadata": {"next_cursor": "page2"},
+            }
+        )
+        page2 = make_response(
+            {
+                "messages": [
+                    {"ts": "1700000002.000000", "text": "b"},
+                    {"ts": "1700000001.000000", "text": "a"},
+                ],
+                "response_metadata": {"next_cursor": ""},
+            }
+        )
+        client = make_client()
+        client.conversations_history.side_effect = [page1, page2]
+
+        with Archive(tmp_path / "archive.db") as archive:
+            fetched, mark = sync_channel(client, archive, "general")
+
+            assert fetched == 3
+            assert mark == "1700000003.000000"
+            assert archive.high_water_mark("general") == mark
+            assert len(archive.recent_messages("general", 10)) == 3
+
+        first_call = client.conversations_history.call_args_list[0]
+        assert "oldest" not in first_call.kwargs
+
+    def test_incremental_sync_uses_high_water_mark(self, tmp_path):
+        client = make_client()
+        client.conversations_history.return_value = make_response(
+            {"messages": [{"ts": "1700000009.000000", "text": "new"}]}
+        )
+
+        with Archive(tmp_path / "archive.db") as archive:
+            archive.store_messages("general", [], high_water_ts="1700000005.000000")
+
+            fetched, mark = sync_channel(client, archive, "general")
+
+        assert fetched == 1
+        assert mark == "1700000009.000000"
+        client.conversations_history.assert_called_once_with(
+            cursor=None, limit=200, channel="general", oldest="1700000005.000000"
+        )
+
+    def test_sync_records_channel_id_and_name(self, tmp_path):
+        client = make_client()
+        client.conversations_history.return_value = make_response(
+            {"messages": [{"ts": "1700000001.000000", "text": "deploy done"}]}
+        )
+
+        with Archive(tmp_path / "archive.db") as archive:
+            sync_channel(client, archive, "C12345678")
+
+            assert "C12345678" in archive.channel_keys("#general")
+            assert len(archive.recent_messages("general", 10)) == 1
+            matches = archive.search("in:#general deploy", 10)
+
+        assert matches[0]["channel"] == {"id": "C12345678", "name": "general"}
+
+    def test_sync_with_nothing_new_keeps_mark(self, tmp_path):
+        client = make_client()
+        client.conversations_history.return_value = make_response({"messages": []})
+
+        with Archive(tmp_path / "archive.db") as archive:
+            archive.store_messages("general", [], high_water_ts="1700000005.000000")
+
+            fetched, mark = sync_channel(client, archive, "general")
+
+        assert fetched == 0
+        assert mark == "1700000005.000000"
+
+
+class TestParseSearchQuery:
+    def test_terms_and_modifiers(self):
+        terms, modifiers = parse_search_query('deploy "rolled back" from:@U123 in:#ops')
+
+        assert terms == ["deploy", "rolled back"]
+        assert modifiers == {"from": "U123", "in": "ops"}
+
+    def test_date_bounds(self):
+        _, modifiers = parse_search_query("before:2024-01-02 after:2024-01-01")
+
+        # after: starts the day after, before: excludes the day itself
+        assert modifiers["after"] == modifiers["before"]
+
+    def test_invalid_date(self):
+        with pytest.raises(ValueError, match="Invalid date"):
+            parse_search_query("after:yesterday")
+
+    def test_fts_query_is_quoted(self):
+        assert build_fts_query(['say "hi"', "dep*", "OR"]) == '"say ""hi""" "dep"* "OR"'
+
+
+class TestArchiveSearch:
+    def _archive(self, tmp_path):
+        archive = Archive(tmp_path / "archive.db")
+        archive.store_messages(
+            "ops",
+            [
+                {"ts": "1700000001.000000", "user": "U1", "text": "Deploy started"},
+                {"ts": "1700000002.000000", "user": "U2", "text": "deployment rolled back"},
+                {"ts": "1700000003.000000", "user": "U1", "text": "lunch?"},
+            ],
+        )
+        archive.store_messages(
+            "general", [{"ts": "1700000004.000000", "user": "U1", "text": "deploy done"}]
+        )
+        return archive
+
+    def test_term_search(self, tmp_path):
+        with self._archive(tmp_path) as archive:
+            matches = archive.search("deploy", 10)
+
+        assert {m["text"] for m in matches} == {"Deploy started", "deploy done"}
+        assert all("name" in m["channel"] for m in matches)
+
+    def test_prefix_and_modifiers(self, tmp_path):
+        with self._archive(tmp_path) as archive:
+            matches = archive.search("deploy* in:#ops from:U2", 10)
+
+        assert [m["text"] for m in matches] == ["deployment rolled back"]
+
+    def test_modifiers_only_newest_first(self, tmp_path):
+        with self._archive(tmp_path) as archive:
+            matches = archive.search("from:U1", 10)
+
+        assert [m["ts"] for m in matches] == [
+            "1700000004.000000",
+            "1700000003.000000",
+            "1700000001.000000",
+        ]
+
+    def test_from_name_uses_user_directory(self, tmp_path):
+        with UserDirectory() as directory:
+            directory.replace(
+                [
+                    {"id": "U1", "name": "jane", "profile": {"display_name": "Jane D"}},
+                    {"id": "U2", "name": "bob", "profile": {}},
+                ]
+            )
+
+        with self._archive(tmp_path) as archive:
+            matches = archive.search("deploy* from:@Jane", 10)
+
+        assert {m["text"] for m in matches} == {"Deploy started", "deploy done"}
+
+    def test_from_unknown_name_is_rejected(self, tmp_path):
+        with self._archive(tmp_path) as archive:
+            with pytest.raises(ValueError, match="Unknown user: @nobody"):
+                archive.search("from:@nobody", 10)
+
+    def test_from_bot_username(self, tmp_path):
+        with self._archive(tmp_path) as archive:
+            archive.store_messages(
+                "ops", [{"ts": "1700000005.000000", "username": "deploybot", "text": "ok"}]
+            )
+
+            assert [m["text"] for m in archive.search("from:deploybot", 10)] == ["ok"]
+
+    def test_index_follows_edits(self, tmp_path):
+        with self._archive(tmp_path) as archive:
+            archive.store_messages(
+                "ops", [{"ts": "1700000003.000000", "user": "U1", "text": "deploy again"}]
+            )
+
+            assert archive.search("lunch", 10) == []
+            assert len(archive.search("again", 10)) == 1
+
+    def test_index_backfilled_for_existing_archive(self, tmp_path):
+        path = tmp_path / "archive.db"
+        with Archive(path) as archive:
+            archive.store_messages("ops", [{"ts": "1700000001.000000", "text": "deploy"}])
+            archive.conn.executescript(
+                "DROP TRIGGER messages_fts_insert; DROP TRIGGER messages_fts_delete;"
+                " DROP TRIGGER messages_fts_update; DROP TABLE messages_fts;"
+            )
+
+        with Archive(path) as archive:
+            assert len(archive.search("deploy", 10)) == 1
@@ -0,0 +1,198 @@
+"""Tests for local caches."""
+
+import hashlib
+import os
+from unittest.mock import patch
+
+from slackasme.utils.cache import (
+    CACHE_FILENAME,
+    DMCache,
+    ReactionIndex,
+    SearchCache,
+    UploadCache,
+    UserDirectory,
+)
+
+
+class TestReactionIndex:
+    def test_add_has_remove(self, tmp_path):
+        with ReactionIndex(tmp_path / CACHE_FILENAME) as index:
+            assert not index.has("C123", "1700000001.000000", "eyes")
+
+            index.add("C123", "1700000001.000000", "eyes")
+            index.add("C123", "1700000001.000000", "eyes")
+
+            assert index.has("C123", "1700000001.000000", "eyes")
+            assert not index.has("C123", "1700000001.000000", "+1")
+
+            index.remove("C123", "1700000001.000000", "eyes")
+            assert not index.has("C123", "1700000001.000000", "eyes")
+
+    def test_channel_hash_is_ignored(self, tmp_path):
+        with ReactionIndex(tmp_path / CACHE_FILENAME) as index:
+            index.add("#general", "1700000001.000000", "eyes")
+            assert index.has("general", "1700000001.000000", "eyes")
+
+    def test_persists_between_opens(self):
+        with ReactionIndex() as index:
+            index.add("C123", "1700000001.000000", "eyes")
+
+        with ReactionIndex() as index:
+            assert index.has("C123", "1700000001.000000", "eyes")
+
+
+class TestUploadCache:
+    def test_digest_is_memoized_by_size_and_mtime(self, tmp_path):
+        path = tmp_path / "build.log"
+        path.write_bytes(b"line 1\n")
+
+        with UploadCache(tmp_path / CACHE_FILENAME) as cache:
+            assert cache.digest(str(path)) == hashlib.sha256(b"line 1\n").hexdigest()
+
+            with patch("hashlib.file_digest") as file_digest:
+                cache.digest(str(path))
+                file_digest.assert_not_called()
+
+            path.write_bytes(b"line 2\n")
+            os.utime(path, ns=(1, 1))
+            assert cache.digest(str(path)) == hashlib.sha256(b"line 2\n").hexdigest()
+
+    def test_lookup_respects_channel_and_ttl(self, tmp_path):
+        with UploadCache(tmp_path / CACHE_FILENAME) as cache:
+            with patch("time.time", return_value=1_700_000_000):
+                cache.record("abc", "#builds", "F123")
+
+                assert cache.lookup("abc", "builds", ttl=60) == "F123"
+                assert cache.lookup("abc", "general", ttl=60) is None
+
+            with patch("time.time", return_value=1_700_000_120):
+                assert cache.lookup("abc", "builds", ttl=60) is None
+                assert cache.lookup("abc", "builds", ttl=3600) == "F123"
+
+            cache.forget("abc", "builds")
+            assert cache.lookup("abc", "builds", ttl=3600) is None
+
+
+def _member(user_id, name, real_name, title="", **extra):
+    profile = {"title": title}
+    return {"id": user_id, "name": name, "real_name": real_name, "profile": profile, **extra}
+
+
+class TestUserDirectory:
+    MEMBERS = [
+        _member("U1", "jsmith", "John Smith", "Engineer"),
+        _member("U2", "johnny", "Johnny Appleseed", "Designer"),
+        _member("U3", "amy", "Amy Johnson", "Engineering Manager"),
+        _member("U4", "olduser", "John Old", deleted=True),
+        _member("U5", "jirabot", "John Bot", is_bot=True),
+    ]
+
+    def test_ranks_exact_then_prefix_then_substring(self, tmp_path):
+        with UserDirectory(tmp_path / CACHE_FILENAME) as directory:
+            assert directory.replace(self.MEMBERS) == 5
+
+            # Username prefix outranks real-name word prefixes; deleted users and bots are skipped
+            matches = [u["id"] for u in directory.search("john", 10)]
+            assert matches[0] == "U2"
+            assert sorted(matches) == ["U1", "U2", "U3"]
+            assert [u["id"] for u in directory.search("johnny", 10)] == ["U2"]
+            assert [u["id"] for u in directory.search("jsmith", 10)] == ["U1"]
+            assert [u["id"] for u in directory.search("engineer", 10)] == ["U1", "U3"]
+
+    def test_fuzzy_and_short_queries(self, tmp_path):
+        with UserDirectory(tmp_path / CACHE_FILENAME) as directory:
+            directory.replace(self.MEMBERS)
+
+            assert directory.search("jhon smith", 10)[0]["id"] == "U1"
+            assert [u["id"] for u in directory.search("am", 10)] == ["U3"]
+            assert directory.search('"%', 10) == []
+
+    def test_fuzzy_reads_rows_sharing_most_trigrams_first(self, tmp_path):
+        members = [*self.MEMBERS, _member("U6", "tom", "Tom Jonson")]
+        with UserDirectory(tmp_path / CACHE_FILENAME) as directory:
+            directory.replace(members)
+
+            assert {u["id"] for u in directory.search("amy jonson", 10)} == {"U3", "U6"}
+            # With room for one candidate, it is the one sharing the most trigrams
+            assert [u["id"] for u in directory.search("amy jonson", 1, candidates=1)] == ["U3"]
+
+    def test_typos_only_looked_for_when_little_else_matched(self, tmp_path):
+        members = [_member(f"U{i}", f"smith{i}", "") for i in range(5)]
+        members.append(_member("U9", "smitt", ""))
+        with UserDirectory(tmp_path / CACHE_FILENAME) as directory:
+            directory.replace(members)
+            assert "U9" not in {u["id"] for u in directory.search("smith", 10)}
+
+            directory.replace(members[:1] + members[-1:])
+            assert [u["id"] for u in directory.search("smith", 10)] == ["U0", "U9"]
+
+    def test_fuzzy_skips_common_trigrams(self, tmp_path):
+        with UserDirectory(tmp_path / CACHE_FILENAME) as directory:
+            directory.replace(self.MEMBERS)
+            statements = []
+            directory.conn.set_trace_callback(statements.append)
+
+            # "smi", "mit" and "ith" are in two name fields each; the rarer ones still find U1
+            with patch("slackasme.utils.cache.COMMON_TRIGRAM_ROWS", 1):
+                assert directory.search("jhon smith", 10)[0]["id"] == "U1"
+
+            postings = [sql for sql in statements if "UNION ALL" in sql]
+            assert postings and not any('"smi"' in sql for sql in postings)
+            assert '"n s"' in postings[0]
+
+    def test_get_by_id_includes_inactive(self, tmp_path):
+        with UserDirectory(tmp_path / CACHE_FILENAME) as directory:
+            directory.replace(self.MEMBERS)
+
+            users = directory.get(["U4", "U1", "U1", "U9"])
+            assert sorted(users) == ["U1", "U4"]
+            assert users["U4"]["name"] == "olduser"
+
+    def test_replace_drops_old_members_and_freshness(self, tmp_path):
+        with UserDirectory(tmp_path / CACHE_FILENAME) as directory:
+            assert not directory.is_fresh(60)
+
+            with patch("time.time", return_value=1_700_000_000):
+                directory.replace(self.MEMBERS)
+            directory.replace(self.MEMBERS[2:3])
+
+            assert [u["id"] for u in directory.search("john", 10)] == ["U3"]
+            assert directory.is_fresh(60)
+
+
+class TestSearchCache:
+    def test_put_get_by_normalized_query(self, tmp_path):
+        with SearchCache(tmp_path / CACHE_FILENAME) as cache:
+            assert cache.get("deploy") is None
+
+            with patch("time.time", return_value=1_700_000_000):
+                cache.put("in:#alerts  Deploy", 100, 3, [{"ts": "1.000001"}])
+
+            entry = cache.get("IN:#alerts deploy")
+            assert entry == {
+                "max_results": 100,
+                "total": 3,
+                "matches": [{"ts": "1.000001"}],
+                "fetched_at": 1_700_000_000,
+            }
+
+
+class TestDMCache:
+    def test_channels_keyed_by_member_set(self, tmp_path):
+        with DMCache(tmp_path / CACHE_FILENAME) as cache:
+            cache.record_channel(["U2", "U1"], "G123", is_mpim=True)
+            cache.record_channel(["U1"], "D123", is_mpim=False)
+
+            assert cache.channel(["U1", "U2"]) == {"id": "G123", "is_im": False, "is_mpim": True}
+            assert cache.channel(["U1"])["id"] == "D123"
+            assert cache.channel(["U2"]) is None
+
+            cache.forget_channel("D123")
+            assert cache.channel(["U1"]) is None
+
+    def test_identifiers_are_normalized(self, tmp_path):
+        with DMCache(tmp_path / CACHE_FILENAME) as cache:
+            cache.record_user("@JohnDoe", "U123")
+
+            assert cache.user_id("johndoe") == "U123"
+            assert cache.user_id("jane@example.com") is None
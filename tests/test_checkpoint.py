@@ -0,0 +1,25 @@
+"""Tests for command checkpoints."""
+
+from slackasme.utils.checkpoint import Checkpoint
+
+
+class TestCheckpoint:
+    def test_round_trip_and_clear(self, config_dir):
+        checkpoint = Checkpoint("purge", {"channel": "general"})
+
+        assert checkpoint.load() == {}
+
+        checkpoint.save({"latest": "1700000000.000000"})
+        assert checkpoint.path.parent == config_dir / "checkpoints"
+        assert Checkpoint("purge", {"channel": "general"}).load() == {
+            "latest": "1700000000.000000"
+        }
+
+        checkpoint.clear()
+        assert checkpoint.load() == {}
+
+    def test_params_select_checkpoint(self):
+        Checkpoint("purge", {"channel": "general"}).save({"latest": "1"})
+
+        assert Checkpoint("purge", {"channel": "random"}).load() == {}
+        assert Checkpoint("other", {"channel": "general"}).load() == {}
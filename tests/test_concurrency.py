@@ -0,0 +1,78 @@
+"""Tests for concurrency helpers."""
+
+import threading
+import time
+from unittest.mock import patch
+
+import pytest
+
+from slackasme.utils.concurrency import RateLimiter, map_concurrent
+
+
+class TestMapConcurrent:
+    def test_preserves_input_order(self):
+        def slow_for_small(n):
+            time.sleep(0.01 * (5 - n))
+            return n * 10
+
+        assert list(map_concurrent(slow_for_small, range(5), max_workers=5)) == [0, 10, 20, 30, 40]
+
+    def test_bounds_calls_in_flight(self):
+        lock = threading.Lock()
+        active = 0
+        peak = 0
+
+        def track(n):
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.01)
+            with lock:
+                active -= 1
+            return n
+
+        assert list(map_concurrent(track, range(20), max_workers=3)) == list(range(20))
+        assert peak <= 3
+
+    def test_runs_concurrently(self):
+        barrier = threading.Barrier(4, timeout=2)
+
+        # Deadlocks (and times out) unless all four calls run at once
+        results = list(
+            map_concurrent(lambda n: barrier.wait() is not None, range(4), max_workers=4)
+        )
+
+        assert results == [True] * 4
+
+    def test_propagates_errors(self):
+        def fail_on_two(n):
+            if n == 2:
+                raise ValueError("boom")
+            return n
+
+        with pytest.raises(ValueError, match="boom"):
+            list(map_concurrent(fail_on_two, range(5)))
+
+
+class TestRateLimiter:
+    def test_first_call_is_immediate(self):
+        limiter = RateLimiter(per_minute=60)
+
+        with patch("slackasme.utils.concurrency.time.sleep") as mock_sleep:
+            limiter.acquire()
+
+        mock_sleep.assert_not_called()
+
+    def test_spaces_subsequent_calls(self):
+        limiter = RateLimiter(per_minute=60)
+
+        with patch("slackasme.utils.concurrency.time.sleep") as mock_sleep:
+            limiter.acquire()
+            limiter.acquire()
+            limiter.acquire()
+
+        waits = [c.args[0] for c in mock_sleep.call_args_list]
+        assert len(waits) == 2
+        assert waits[0] == pytest.approx(1.0, abs=0.1)
+        assert waits[1] == pytest.approx(2.0, abs=0.1)
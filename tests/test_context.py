@@ -0,0 +1,82 @@
+"""Tests for search hit context fetching."""
+
+from unittest.mock import MagicMock
+
+from slackasme.utils.context import attach_context, fetch_channel_context
+
+
+def _ts(i):
+    return f"17000{i:05d}.000100"
+
+
+def _history_client(channels):
+    """A client whose conversations_history serves `channels` (id -> message count) like Slack."""
+    client = MagicMock()
+
+    def conversations_history(channel, limit, inclusive, latest=None, oldest=None):
+        assert inclusive is False
+        messages = [{"ts": _ts(i), "text": f"{channel} {i}"} for i in range(channels[channel])]
+        window = [
+            m
+            for m in messages
+            if (latest is None or m["ts"] < latest) and (oldest is None or m["ts"] > oldest)
+        ]
+        # Closest to latest, or to oldest when only oldest is given; newest first
+        window = window[:limit] if latest is None and oldest else window[-limit:]
+        return {"messages": list(reversed(window))}
+
+    client.conversations_history.side_effect = conversations_history
+    return client
+
+
+class TestFetchChannelContext:
+    def test_nearby_hits_share_one_range(self):
+        client = _history_client({"C1": 100})
+
+        fetched = fetch_channel_context(client, "C1", [_ts(50), _ts(10), _ts(12)], 3)
+
+        expected = [7, 8, 9, 11, 12, 13, 14, 15, 16, 47, 48, 49, 51, 52, 53]
+        assert sorted(fetched) == [_ts(i) for i in expected]
+        # One before-request and forward pages per range, never the same message twice
+        calls = client.conversations_history.call_args_list
+        assert [c.kwargs.get("latest") for c in calls if "latest" in c.kwargs] == [_ts(10), _ts(50)]
+        assert len(calls) == 5
+
+    def test_new_range_stops_at_already_fetched(self):
+        client = _history_client({"C1": 100})
+
+        fetch_channel_context(client, "C1", [_ts(10), _ts(16)], 3)
+
+        before_second = client.conversations_history.call_args_list[2].kwargs
+        assert before_second["latest"] == _ts(16)
+        assert before_second["oldest"] == _ts(13)
+
+    def test_end_of_channel(self):
+        client = _history_client({"C1": 5})
+
+        fetched = fetch_channel_context(client, "C1", [_ts(4)], 3)
+
+        assert sorted(fetched) == [_ts(1), _ts(2), _ts(3)]
+
+
+class TestAttachContext:
+    def test_groups_context_without_duplicates(self):
+        client = _history_client({"C1": 100, "C2": 20})
+        matches = [
+            {"ts": _ts(10), "channel": {"id": "C1"}},
+            {"ts": _ts(5), "channel": {"id": "C2"}},
+            {"ts": _ts(12), "channel": {"id": "C1"}},
+        ]
+
+        attach_context(client, matches, 2)
+
+        def texts(match, key):
+            return [m["text"] for m in match["context"][key]]
+
+        assert texts(matches[0], "before") == ["C1 8", "C1 9"]
+        assert texts(matches[0], "after") == ["C1 11"]
+        assert texts(matches[1], "before") == ["C2 3", "C2 4"]
+        assert texts(matches[1], "after") == ["C2 6", "C2 7"]
+        # C1 11 was shown with the first hit; C1 10 is a hit itself
+        assert texts(matches[2], "before") == []
+        assert texts(matches[2], "after") == ["C1 13", "C1 14"]
@@ -0,0 +1,226 @@
+"""Tests for the Socket Mode tail backend, against a local WebSocket stand-in."""
+
+import base64
+import hashlib
+import json
+import queue
+import socket
+import struct
+import threading
+import time
+from unittest.mock import MagicMock
+
+from slackasme.utils.events import SocketModeTail
+
+WEBSOCKET_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+
+class WebSocketStandIn:
+    """Minimal local WebSocket server standing in for Slack's Socket Mode endpoint."""
+
+    def __init__(self):
+        self.server = socket.create_server(("127.0.0.1", 0))
+        self.url = f"ws://127.0.0.1:{self.server.getsockname()[1]}/"
+        self.connections = queue.Queue()
+        self.received = queue.Queue()
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+
+    def send(self, conn, payload: dict) -> None:
+        data = json.dumps(payload).encode()
+        conn.sendall(self._frame(0x1, data))
+
+    def close(self) -> None:
+        self.server.close()
+
+    def _frame(self, opcode: int, data: bytes) -> bytes:
+        if len(data) < 126:
+            header = struct.pack("!BB", 0x80 | opcode, len(data))
+        else:
+            header = struct.pack("!BBH", 0x80 | opcode, 126, len(data))
+        return header + data
+
+    def _accept_loop(self):
+        while True:
+            try:
+                conn, _ = self.server.accept()
+            except OSError:
+                return
+            self._handshake(conn)
+            self.connections.put(conn)
+            threading.Thread(target=self._read_loop, args=(conn,), daemon=True).start()
+
+    def _handshake(self, conn):
+        request = b""
+        while b"\r\n\r\n" not in request:
+            request += conn.recv(1024)
+        headers = dict(
+            line.split(": ", 1) for line in request.decode().split("\r\n")[1:] if ": " in line
+        )
+        key = headers["Sec-WebSocket-Key"].strip()
+        accept = base64.b64encode(hashlib.sha1((key + WEBSOCKET_GUID).encode()).digest())
+        conn.sendall(
+            b"HTTP/1.1 101 Switching Protocols\r\n"
+            b"Upgrade: websocket\r\nConnection: Upgrade\r\n"
+            b"Sec-WebSocket-Accept: " + accept + b"\r\n\r\n"
+        )
+
+    def _recv_exact(self, conn, n: int) -> bytes:
+        data = b""
+        while len(data) < n:
+            chunk = conn.recv(n - len(data))
+            if not chunk:
+                raise ConnectionError
+            data += chunk
+        return data
+
+    def _read_loop(self, conn):
+        try:
+            while True:
+                first, second = self._recv_exact(conn, 2)
+                opcode, length = first & 0x0F, second & 0x7F
+                if length == 126:
+                    (length,) = struct.unpack("!H", self._recv_exact(conn, 2))
+                elif length == 127:
+                    (length,) = struct.unpack("!Q", self._recv_exact(conn, 8))
+                mask = self._recv_exact(conn, 4)
+                masked = self._recv_exact(conn, length)
+                payload = bytes(b ^ mask[i % 4] for i, b in enumerate(masked))
+
+                if opcode == 0x1:
+                    self.received.put(json.loads(payload))
+                elif opcode == 0x9:
+                    conn.sendall(self._frame(0xA, payload))
+                elif opcode == 0x8:
+                    return
+        except OSError:
+            return
+
+
+def make_response(messages):
+    data = {"messages": messages, "response_metadata": {"next_cursor": ""}}
+    response = MagicMock()
+    response.__getitem__ = lambda self, key: data[key]
+    response.get = lambda key, default=None: data.get(key, default)
+    return response
+
+
+def wait_for(predicate, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.02)
+
+
+def message_event(envelope_id, **event):
+    return {
+        "type": "events_api",
+        "envelope_id": envelope_id,
+        "accepts_response_payload": False,
+        "payload": {"type": "event_callback", "event": {"type": "message", **event}},
+    }
+
+
+class TestSocketModeTail:
+    def test_live_events_and_backfill_after_reconnect(self):
+        server = WebSocketStandIn()
+        missed = []
+
+        def history(**kwargs):
+            if "oldest" in kwargs:
+                return make_response(list(missed))
+            return make_response([{"ts": "1700000000.000000", "text": "existing"}])
+
+        web_client = MagicMock()
+        web_client.apps_connections_open.return_value = {"url": server.url}
+        web_client.conversations_history.side_effect = history
+
+        emitted = []
+        tail = SocketModeTail(
+            "xapp-test", web_client, ["C1"], lambda channel, msg: emitted.append(msg["ts"])
+        )
+
+        try:
+            tail.start()
+            conn = server.connections.get(timeout=5)
+            server.send(conn, {"type": "hello"})
+
+            # Live event is acked and emitted; other channels and edits are ignored
+            server.send(conn, message_event("e0", channel="C2", ts="1700000001.000000"))
+            server.send(
+                conn,
+                message_event(
+                    "e1", channel="C1", ts="1700000001.500000", subtype="message_changed"
+                ),
+            )
+            server.send(conn, message_event("e2", channel="C1", ts="1700000002.000000"))
+            acks = {server.received.get(timeout=5)["envelope_id"] for _ in range(3)}
+            assert acks == {"e0", "e1", "e2"}
+            wait_for(lambda: emitted == ["1700000002.000000"])
+
+            # Slack asks clients to reconnect periodically; a message lands in the gap
+            # and the new connection's hello backfills it
+            missed.append({"ts": "1700000003.000000", "text": "missed"})
+            server.send(conn, {"type": "disconnect", "reason": "refresh_requested"})
+            conn = server.connections.get(timeout=10)
+            server.send(conn, {"type": "hello"})
+            wait_for(lambda: emitted == ["1700000002.000000", "1700000003.000000"])
+
+            oldest = web_client.conversations_history.call_args.kwargs["oldest"]
+            assert oldest == "1700000002.000000"
+        finally:
+            tail.close()
+            server.close()
+
+    def _request(self, envelope_id, **event):
+        request = MagicMock(type="events_api", envelope_id=envelope_id)
+        request.payload = {"event": {"type": "message", **event}}
+        return request
+
+    def test_duplicate_and_thread_reply_events_are_skipped(self):
+        web_client = MagicMock()
+        emitted = []
+        tail = SocketModeTail(
+            "xapp-test", web_client, ["C1"], lambda channel, msg: emitted.append(msg["ts"])
+        )
+        tail.start_ts["C1"] = tail.tails["C1"].last_ts = "1700000005.000000"
+        socket_client = MagicMock()
+
+        for envelope_id, event in [
+            ("e1", {"channel": "C1", "ts": "1700000004.000000"}),
+            ("e2", {"channel": "C1", "ts": "1700000006.000000", "thread_ts": "1700000001.0"}),
+            ("e3", {"channel": "C1", "ts": "1700000007.000000"}),
+            ("e4", {"channel": "C1", "ts": "1700000007.000000"}),
+        ]:
+            tail._on_request(socket_client, self._request(envelope_id, **event))
+
+        assert emitted == ["1700000007.000000"]
+        assert socket_client.send_socket_mode_response.call_count == 4
+        tail.close()
+
+    def test_out_of_order_events_are_all_emitted_once(self):
+        web_client = MagicMock()
+        emitted = []
+        tail = SocketModeTail(
+            "xapp-test", web_client, ["C1"], lambda channel, msg: emitted.append(msg["ts"])
+        )
+        tail.start_ts["C1"] = tail.tails["C1"].last_ts = "1700000000.000000"
+        socket_client = MagicMock()
+
+        tail._on_request(socket_client, self._request("e1", channel="C1", ts="1700000002.000000"))
+        tail._on_request(socket_client, self._request("e2", channel="C1", ts="1700000001.000000"))
+        assert emitted == ["1700000002.000000", "1700000001.000000"]
+        assert tail.tails["C1"].last_ts == "1700000002.000000"
+
+        # A backfill returning an already delivered message doesn't repeat it
+        web_client.conversations_history.return_value = make_response(
+            [{"ts": "1700000003.000000"}, {"ts": "1700000002.000000"}]
+        )
+        tail.backfill()
+        assert emitted == ["1700000002.000000", "1700000001.000000", "1700000003.000000"]
+        tail.close()
+
+    def test_listeners_run_on_one_thread(self):
+        tail = SocketModeTail("xapp-test", MagicMock(), ["C1"], lambda channel, msg: None)
+
+        assert tail.socket_client.message_workers._max_workers == 1
+        tail.close()
@@ -4,7 +4,12 @@ from unittest.mock import MagicMock, patch, call
 
 import pytest
 
-from slackasme.utils.resolution import paginate_until, resolve_user, resolve_users
+from slackasme.utils.resolution import (
+    iter_numbered_pages,
+    paginate_until,
+    resolve_user,
+    resolve_users,
+)
 
 
 class TestPaginateUntil:
@@ -149,6 +154,36 @@ class TestPaginateUntil:
         assert result is None
 
 
+class TestIterNumberedPages:
+    def _method(self, pages):
+        def files_list(page, count, **kwargs):
+            return {"files": [f"page-{page}"], "paging": {"page": page, "pages": pages}}
+
+        return MagicMock(side_effect=files_list)
+
+    def test_yields_every_page_in_order(self):
+        method = self._method(pages=5)
+
+        results = list(iter_numbered_pages(method, max_workers=3, channel="C123"))
+
+        assert [r["files"][0] for r in results] == [f"page-{n}" for n in range(1, 6)]
+        assert method.call_count == 5
+        assert all(c.kwargs["channel"] == "C123" for c in method.call_args_list)
+
+    def test_max_pages(self):
+        method = self._method(pages=5)
+
+        results = list(iter_numbered_pages(method, max_pages=2))
+
+        assert len(results) == 2
+        assert method.call_count == 2
+
+    def test_single_page(self):
+        method = MagicMock(return_value={"files": []})
+
+        assert len(list(iter_numbered_pages(method))) == 1
+
+
 class TestResolveUser:
     """Test resolve_user smart resolution."""
 
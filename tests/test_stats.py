@@ -0,0 +1,50 @@
+"""Tests for streaming aggregates."""
+
+from slackasme.utils.stats import ReactionStats, base_emoji
+
+
+class TestReactionStats:
+    def test_counts_per_emoji_and_user(self):
+        stats = ReactionStats()
+        stats.add_messages(
+            [
+                {"ts": "1", "reactions": [{"name": "eyes", "count": 2, "users": ["U1", "U2"]}]},
+                {"ts": "2", "text": "no reactions"},
+            ]
+        )
+        stats.add_messages(
+            [
+                {
+                    "ts": "3",
+                    "reactions": [
+                        {"name": "+1::skin-tone-3", "count": 1, "users": ["U1"]},
+                        {"name": "eyes", "count": 1, "users": ["U1"]},
+                    ],
+                },
+            ]
+        )
+
+        summary = stats.to_dict(top=10)
+
+        assert summary["messages"] == 3
+        assert summary["reacted_messages"] == 2
+        assert summary["reactions"] == 4
+        assert summary["emoji"] == [{"name": "eyes", "count": 3}, {"name": "+1", "count": 1}]
+        assert summary["users"] == [{"user": "U1", "count": 3}, {"user": "U2", "count": 1}]
+
+    def test_top_limits_rows(self):
+        stats = ReactionStats()
+        stats.add_messages(
+            [
+                {
+                    "ts": "1",
+                    "reactions": [{"name": f"e{i}", "count": 1, "users": []} for i in range(5)],
+                }
+            ]
+        )
+
+        assert len(stats.to_dict(top=2)["emoji"]) == 2
+
+    def test_base_emoji(self):
+        assert base_emoji("thumbsup::skin-tone-2") == "thumbsup"
+        assert base_emoji("eyes") == "eyes"
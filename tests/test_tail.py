@@ -0,0 +1,132 @@
+"""Tests for channel tail polling."""
+
+from unittest.mock import MagicMock
+
+import pytest
+
+from slackasme.utils.tail import AdaptivePollInterval, ChannelTail, TailScheduler
+
+
+def make_response(messages, next_cursor=""):
+    data = {"messages": messages, "response_metadata": {"next_cursor": next_cursor}}
+    response = MagicMock()
+    response.data = data
+    response.__getitem__ = lambda self, key: data[key]
+    response.get = lambda key, default=None: data.get(key, default)
+    return response
+
+
+class TestAdaptivePollInterval:
+    def test_backs_off_when_quiet(self):
+        interval = AdaptivePollInterval(minimum=2, maximum=10, backoff=2)
+
+        assert interval.update(0) == 4
+        assert interval.update(0) == 8
+        assert interval.update(0) == 10
+
+    def test_resets_when_busy(self):
+        interval = AdaptivePollInterval(minimum=2, maximum=10, backoff=2)
+        interval.update(0)
+        interval.update(0)
+
+        assert interval.update(3) == 2
+
+
+class TestChannelTail:
+    def test_start_returns_backlog_oldest_first(self):
+        client = MagicMock()
+        client.conversations_history.return_value = make_response(
+            [{"ts": "1700000003.000000"}, {"ts": "1700000002.000000"}]
+        )
+
+        tail = ChannelTail(client, "general")
+        backlog = tail.start(backlog=2)
+
+        assert [m["ts"] for m in backlog] == ["1700000002.000000", "1700000003.000000"]
+        assert tail.last_ts == "1700000003.000000"
+
+    def test_start_without_backlog(self):
+        client = MagicMock()
+        client.conversations_history.return_value = make_response([{"ts": "1700000003.000000"}])
+
+        tail = ChannelTail(client, "general")
+
+        assert tail.start(backlog=0) == []
+        assert tail.last_ts == "1700000003.000000"
+        client.conversations_history.assert_called_once_with(channel="general", limit=1)
+
+    def test_poll_requests_only_newer_messages(self):
+        client = MagicMock()
+        client.conversations_history.side_effect = [
+            make_response([{"ts": "1700000006.000000"}, {"ts": "1700000005.000000"}], "next"),
+            make_response([{"ts": "1700000004.000000"}]),
+            make_response([]),
+        ]
+
+        tail = ChannelTail(client, "general", page_size=2)
+        tail.last_ts = "1700000003.000000"
+
+        new = tail.poll()
+
+        assert [m["ts"] for m in new] == [
+            "1700000004.000000",
+            "1700000005.000000",
+            "1700000006.000000",
+        ]
+        client.conversations_history.assert_any_call(
+            cursor=None, limit=2, channel="general", oldest="1700000003.000000"
+        )
+
+        assert tail.poll() == []
+        assert tail.last_ts == "1700000006.000000"
+        assert client.conversations_history.call_args.kwargs["oldest"] == "1700000006.000000"
+
+
+class TestTailScheduler:
+    def _scheduler(self, channels, **kwargs):
+        tails = []
+        for channel in channels:
+            tail = MagicMock(spec=ChannelTail)
+            tail.channel = channel
+            tail.start.return_value = []
+            tail.poll.return_value = []
+            tails.append(tail)
+        return TailScheduler(tails, **kwargs), tails
+
+    def test_quiet_channels_share_budget_equally(self):
+        scheduler, _ = self._scheduler(
+            [f"c{i}" for i in range(30)], budget=30, min_interval=2, max_interval=120
+        )
+
+        # 30 polls/min over 30 equally quiet channels -> one poll per minute each
+        assert scheduler.interval_for("c0") == pytest.approx(60.0)
+
+    def test_busy_channel_gets_larger_share(self):
+        scheduler, _ = self._scheduler(
+            ["busy", "quiet1", "quiet2"], budget=30, min_interval=2, max_interval=60
+        )
+        scheduler.activity["busy"] = 5.0
+
+        assert scheduler.interval_for("busy") < scheduler.interval_for("quiet1")
+        assert scheduler.interval_for("busy") == pytest.approx(60 / (30 * 5.1 / 5.3))
+
+    def test_single_channel_uses_adaptive_interval(self):
+        scheduler, _ = self._scheduler(["general"], budget=40, min_interval=2, max_interval=60)
+        scheduler.intervals["general"].current = 9.0
+
+        assert scheduler.interval_for("general") == 9.0
+
+    def test_poll_due_only_polls_due_channels_and_merges(self):
+        scheduler, (alerts, deploys) = self._scheduler(["alerts", "deploys"], budget=6000)
+        scheduler.start()
+        alerts.poll.return_value = [{"ts": "1700000002.000000"}]
+        deploys.poll.return_value = [{"ts": "1700000001.000000"}]
+
+        scheduler.next_due["deploys"] = float("inf")
+        scheduler.next_due["alerts"] = 0
+
+        merged = scheduler.poll_due()
+
+        assert merged == [("alerts", {"ts": "1700000002.000000"})]
+        deploys.poll.assert_not_called()
+        assert scheduler.activity["alerts"] > 0
@@ -0,0 +1,63 @@
+"""Tests for multi-file uploads."""
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from slack_sdk.errors import SlackRequestError
+
+from slackasme.utils.upload import post_file, upload_files
+
+
+def make_client(base_url):
+    client = MagicMock()
+    client.timeout = 5
+    client.ssl = None
+    client.files_getUploadURLExternal.side_effect = lambda filename, length: {
+        "upload_url": f"{base_url}/{filename}",
+        "file_id": f"F_{filename}",
+    }
+    return client
+
+
+class TestUploadFiles:
+    def test_uploads_in_parallel_and_completes_once(self, upload_server, tmp_path):
+        base_url, received = upload_server
+        paths = []
+        for i in range(6):
+            path = tmp_path / f"artifact-{i}.bin"
+            path.write_bytes(bytes([i]) * (i + 1))
+            paths.append(str(path))
+        client = make_client(base_url)
+
+        response, uploads = upload_files(
+            client, paths, channel="C123", initial_comment="Build 42", max_workers=3
+        )
+
+        assert response is client.files_completeUploadExternal.return_value
+        assert [upload["name"] for upload in uploads] == [f"artifact-{i}.bin" for i in range(6)]
+        assert [upload["size"] for upload in uploads] == [1, 2, 3, 4, 5, 6]
+        assert received["/artifact-3.bin"] == b"\x03" * 4
+        client.files_completeUploadExternal.assert_called_once()
+        assert client.files_completeUploadExternal.call_args.kwargs["channel_id"] == "C123"
+
+    def test_failed_transfer_raises(self, upload_server, tmp_path):
+        base_url, _ = upload_server
+        path = tmp_path / "a.txt"
+        path.write_text("data")
+
+        with pytest.raises(SlackRequestError, match="status: 500"):
+            upload_files(make_client(f"{base_url}/fail"), [str(path)], channel="C123")
+
+
+class TestPostFile:
+    def test_streams_in_chunks_with_progress(self, upload_server, tmp_path):
+        base_url, received = upload_server
+        path = tmp_path / "big.bin"
+        path.write_bytes(bytes(range(256)) * 40)
+        sent = []
+
+        with patch("slackasme.utils.upload.UPLOAD_CHUNK_SIZE", 1024):
+            post_file(make_client(base_url), f"{base_url}/big.bin", str(path), sent.append)
+
+        assert sent == [1024] * 10
+        assert received["/big.bin"] == path.read_bytes()
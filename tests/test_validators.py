@@ -8,6 +8,9 @@ import pytest
 
 from slackasme.validators import (
     validate_channel,
+    validate_concurrency,
+    validate_date,
+    validate_duration,
     validate_emoji,
     validate_file_path,
     validate_limit,
@@ -73,6 +76,42 @@ class TestValidateTimestamp:
             validate_timestamp(None, None, "1234567890123456")
 
 
+class TestValidateDate:
+    def test_none_passthrough(self):
+        assert validate_date(None, None, None) is None
+
+    def test_timestamps_are_padded(self):
+        assert validate_date(None, None, "1700000000") == "1700000000.000000"
+        assert validate_date(None, None, "1700000000.5") == "1700000000.500000"
+        assert validate_date(None, None, "1700000000.123456") == "1700000000.123456"
+
+    def test_date_and_datetime(self):
+        day = float(validate_date(None, None, "2024-01-01"))
+        afternoon = float(validate_date(None, None, "2024-01-01T14:30"))
+
+        assert afternoon - day == 14.5 * 3600
+
+    def test_invalid_date(self):
+        with pytest.raises(click.BadParameter, match="Invalid date"):
+            validate_date(None, None, "last tuesday")
+
+
+class TestValidateDuration:
+    def test_none_passthrough(self):
+        assert validate_duration(None, None, None) is None
+
+    def test_units(self):
+        assert validate_duration(None, None, "90s") == 90
+        assert validate_duration(None, None, "30m") == 1800
+        assert validate_duration(None, None, "12h") == 43200
+        assert validate_duration(None, None, "7d") == 604800
+        assert validate_duration(None, None, "2w") == 1209600
+
+    def test_invalid_duration(self):
+        with pytest.raises(click.BadParameter, match="Invalid duration"):
+            validate_duration(None, None, "3 days")
+
+
 class TestValidateEmoji:
     def test_valid_emoji(self):
         assert validate_emoji(None, None, "eyes") == "eyes"
@@ -133,6 +172,19 @@ class TestValidateLimit:
             validate_limit(None, None, 1001)
 
 
+class TestValidateConcurrency:
+    def test_valid_concurrency(self):
+        assert validate_concurrency(None, None, 8) == 8
+
+    def test_concurrency_too_low(self):
+        with pytest.raises(click.BadParameter, match="at least 1"):
+            validate_concurrency(None, None, 0)
+
+    def test_concurrency_too_high(self):
+        with pytest.raises(click.BadParameter, match="too high"):
+            validate_concurrency(None, None, 33)
+
+
 class TestValidateSearchQuery:
     def test_valid_query(self):
         assert validate_search_query(None, None, "test query") == "test query"